@@ -197,7 +197,6 @@ class Settings:
     twilio_number: Optional[str]
     voice: str
     language: str
-    fallback_voice: str
     practice: PracticeConfig
     profile: str
 
@@ -227,7 +226,6 @@ def _build_settings(practice: PracticeConfig, profile: str) -> Settings:
         twilio_number=os.getenv("TWILIO_NUMBER"),
         voice=voice or FALLBACK_VOICE,
         language=language or FALLBACK_LANGUAGE,
-        fallback_voice=FALLBACK_VOICE,
         practice=practice,
         profile=profile,
     )
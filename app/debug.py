@@ -1,4 +1,7 @@
+from dataclasses import fields, is_dataclass
+
 from fastapi import APIRouter, Query
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse, PlainTextResponse
 from pathlib import Path
 from typing import Optional
@@ -18,11 +21,22 @@ except Exception:
     CALLS = {}
 
 
+_SKIP_FIELDS = {"transcript", "settings"}
+
+
+def _state_summary(state) -> dict:
+    if is_dataclass(state):
+        items = {f.name: getattr(state, f.name) for f in fields(state)}
+    else:
+        items = dict(state)
+    return jsonable_encoder({k: v for k, v in items.items() if k not in _SKIP_FIELDS})
+
+
 @router.get("/_debug/state")
 def debug_state():
     # Shallow copy for safety
     try:
-        snapshot = {k: {kk: vv for kk, vv in v.items() if kk != "transcript"} for k, v in CALLS.items()}
+        snapshot = {k: _state_summary(v) for k, v in list(CALLS.items())}
     except Exception:
         snapshot = {}
     return JSONResponse(snapshot)
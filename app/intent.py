@@ -30,22 +30,62 @@ def _lev(a: str, b: str, limit: int = 2) -> int:
     return dp[-1]
 
 
-def _any_fuzzy(text: str, vocab: Iterable[str], max_dist: int = 1) -> bool:
-    tokens = text.split()
-    for raw in vocab:
-        keyword = (raw or "").replace("’", "'").lower().strip()
-        if not keyword:
-            continue
-        if " " in keyword:
-            if keyword in text:
-                return True
-            continue
-        if keyword in tokens:
+def _deletes(word: str, depth: int) -> set[str]:
+    """Every string reachable from ``word`` by removing up to ``depth`` characters."""
+    found = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1 :] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+class _FuzzyVocab:
+    """A keyword set indexed once for fuzzy matching against caller text.
+
+    Multi-word keywords match as substrings, compiled into one alternation so a
+    single regex scan replaces a ``in`` check per phrase; single words match a
+    token exactly or within ``max_dist`` edits. Single words are kept in a symmetric-delete
+    index: two words within ``max_dist`` edits always share a string reachable
+    by at most ``max_dist`` deletions from each, so only those candidates need
+    the Levenshtein check instead of every keyword.
+    """
+
+    __slots__ = ("max_dist", "phrases", "phrase_re", "words", "by_delete")
+
+    def __init__(self, vocab: Iterable[str], max_dist: int = 1) -> None:
+        self.max_dist = max_dist
+        phrases: list[str] = []
+        words: set[str] = set()
+        for raw in vocab:
+            keyword = (raw or "").replace("’", "'").lower().strip()
+            if not keyword:
+                continue
+            if " " in keyword:
+                phrases.append(keyword)
+            else:
+                words.add(keyword)
+        self.phrases = tuple(phrases)
+        self.phrase_re = re.compile("|".join(map(re.escape, phrases))) if phrases else None
+        self.words = frozenset(words)
+        self.by_delete: dict[str, list[str]] = {}
+        for word in self.words:
+            for key in _deletes(word, max_dist):
+                self.by_delete.setdefault(key, []).append(word)
+
+    def matches(self, text: str) -> bool:
+        if self.phrase_re is not None and self.phrase_re.search(text):
+            return True
+        tokens = text.split()
+        if not self.words.isdisjoint(tokens):
             return True
+        max_dist = self.max_dist
         for token in tokens:
-            if _lev(token, keyword, limit=max_dist) <= max_dist:
-                return True
-    return False
+            for key in _deletes(token, max_dist):
+                for word in self.by_delete.get(key, ()):
+                    if _lev(token, word, limit=max_dist) <= max_dist:
+                        return True
+        return False
 
 
 HOURS_KEYWORDS = {
@@ -197,6 +237,21 @@ AFFIRM_KEYWORDS = {
 }
 
 
+_GOODBYE_VOCAB = _FuzzyVocab(GOODBYE_KEYWORDS, max_dist=1)
+_PRICE_VOCAB = _FuzzyVocab(PRICE_KEYWORDS, max_dist=1)
+_QUOTE_VOCAB = _FuzzyVocab(QUOTE_KEYWORDS, max_dist=1)
+_BOOKING_VOCAB = _FuzzyVocab(BOOKING_KEYWORDS, max_dist=1)
+_AVAILABILITY_VOCAB = _FuzzyVocab(AVAILABILITY_KEYWORDS, max_dist=2)
+_ADDRESS_VOCAB = _FuzzyVocab(ADDRESS_KEYWORDS, max_dist=2)
+_HOURS_VOCAB = _FuzzyVocab(HOURS_KEYWORDS, max_dist=1)
+_AFFIRM_VOCAB = _FuzzyVocab(AFFIRM_KEYWORDS, max_dist=1)
+_GARAGE_VOCABS = {
+    intent_name: _FuzzyVocab(keywords, max_dist=1) for intent_name, keywords in GARAGE_INTENT_KEYWORDS.items()
+}
+# "booking" and "make booking" are covered by "book" as substrings.
+_EXPLICIT_BOOKING_RE = re.compile("book|appointment|schedule|reserve")
+
+
 def classify(speech: Optional[str]) -> Optional[str]:
     if not speech:
         return None
@@ -205,24 +260,21 @@ def classify(speech: Optional[str]) -> Optional[str]:
     if not text:
         return None
 
-    goodbye_intent = _any_fuzzy(text, GOODBYE_KEYWORDS, max_dist=1)
+    goodbye_intent = _GOODBYE_VOCAB.matches(text)
     if goodbye_intent:
         return "goodbye"
 
-    price_intent = _any_fuzzy(text, PRICE_KEYWORDS, max_dist=1)
-    quote_intent = _any_fuzzy(text, QUOTE_KEYWORDS, max_dist=1)
-    booking_intent = _any_fuzzy(text, BOOKING_KEYWORDS, max_dist=1)
-    availability_intent = _any_fuzzy(text, AVAILABILITY_KEYWORDS, max_dist=2)
-    address_intent = _any_fuzzy(text, ADDRESS_KEYWORDS, max_dist=2)
-    hours_intent = _any_fuzzy(text, HOURS_KEYWORDS, max_dist=1)
-    affirm_intent = _any_fuzzy(text, AFFIRM_KEYWORDS, max_dist=1)
+    price_intent = _PRICE_VOCAB.matches(text)
+    quote_intent = _QUOTE_VOCAB.matches(text)
+    booking_intent = _BOOKING_VOCAB.matches(text)
+    availability_intent = _AVAILABILITY_VOCAB.matches(text)
+    address_intent = _ADDRESS_VOCAB.matches(text)
+    hours_intent = _HOURS_VOCAB.matches(text)
+    affirm_intent = _AFFIRM_VOCAB.matches(text)
     service = infer_service(speech)
-    explicit_booking = any(
-        keyword in text
-        for keyword in ("book", "booking", "appointment", "schedule", "reserve", "make booking")
-    )
+    explicit_booking = _EXPLICIT_BOOKING_RE.search(text) is not None
 
-    garage_hint = any(_any_fuzzy(text, keywords, max_dist=1) for keywords in GARAGE_INTENT_KEYWORDS.values())
+    garage_hint = any(vocab.matches(text) for vocab in _GARAGE_VOCABS.values())
 
     if quote_intent and not booking_intent:
         if not garage_hint:
@@ -240,8 +292,8 @@ def classify(speech: Optional[str]) -> Optional[str]:
         return "availability"
     if hours_intent:
         return "hours"
-    for intent_name, keywords in GARAGE_INTENT_KEYWORDS.items():
-        if _any_fuzzy(text, keywords, max_dist=1):
+    for intent_name, vocab in _GARAGE_VOCABS.items():
+        if vocab.matches(text):
             return intent_name
     if price_intent:
         return "prices"
@@ -283,6 +335,8 @@ _APPT_KEYWORDS = {
     "pull my tooth": "Extraction",
     "remove a tooth": "Extraction",
 }
+# Normalised once here rather than for every keyword on every call.
+_APPT_TARGETS = tuple((_normalize(raw), canonical) for raw, canonical in _APPT_KEYWORDS.items())
 
 
 def extract_appt_type(text: str) -> Optional[str]:
@@ -303,8 +357,7 @@ def extract_appt_type(text: str) -> Optional[str]:
             return mapped
 
     tokens = lowered.split()
-    for raw, canonical in _APPT_KEYWORDS.items():
-        target = _normalize(raw)
+    for target, canonical in _APPT_TARGETS:
         if not target:
             continue
         if " " in target:
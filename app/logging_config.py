@@ -1,5 +1,7 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 import os
 import json
@@ -14,14 +16,18 @@ def setup_logging():
     logger.setLevel(logging.INFO)
 
     # Avoid duplicate handlers on reload
-    if any(isinstance(h, RotatingFileHandler) for h in logger.handlers):
+    if any(isinstance(h, QueueHandler) for h in logger.handlers):
         return
 
-    # File handler (rotating)
+    # File handler (rotating), fed from a queue so webhook handlers never wait on disk
     file_handler = RotatingFileHandler(LOG_FILE, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
     file_fmt = logging.Formatter('%(asctime)s | %(levelname)s | %(name)s | %(message)s')
     file_handler.setFormatter(file_fmt)
-    logger.addHandler(file_handler)
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    logger.addHandler(QueueHandler(log_queue))
 
     # Optional JSON to stdout
     if os.getenv("DEBUG_LOG_JSON", "false").lower() == "true":
@@ -4,6 +4,7 @@ import calendar
 import re
 from datetime import datetime, timedelta
 from datetime import date as _date
+from functools import lru_cache
 from typing import Optional, Sequence
 
 
@@ -36,35 +37,43 @@ def _ordinal(n: int) -> str:
 def human_day_phrase(value: str | datetime | _date, today: Optional[datetime] = None) -> str:
     """Convert a date-like input into a natural, speech-friendly phrase."""
 
-    target_dt: Optional[datetime] = None
+    base = today.date() if today else today_date()
+    if isinstance(value, str):
+        # The same slot date is read out several times per call; cached per
+        # (date, today) so phrases roll over correctly at midnight.
+        return _human_day_phrase(value, base)
     if isinstance(value, datetime):
-        target_dt = value
-    elif isinstance(value, _date):
-        target_dt = datetime.combine(value, datetime.min.time())
-    elif isinstance(value, str):
-        try:
-            target_dt = datetime.strptime(value, "%Y-%m-%d")
-        except Exception:
-            return value
-    if target_dt is None:
-        return str(value)
-
-    today_dt = today or datetime.combine(today_date(), datetime.min.time())
-    delta = (target_dt.date() - today_dt.date()).days
-    dow = calendar.day_name[target_dt.weekday()]
+        return _day_phrase(value.date(), base)
+    if isinstance(value, _date):
+        return _day_phrase(value, base)
+    return str(value)
+
+
+@lru_cache(maxsize=512)
+def _human_day_phrase(value: str, base: _date) -> str:
+    try:
+        target = datetime.strptime(value, "%Y-%m-%d").date()
+    except Exception:
+        return value
+    return _day_phrase(target, base)
+
+
+def _day_phrase(target: _date, base: _date) -> str:
+    delta = (target - base).days
+    dow = calendar.day_name[target.weekday()]
 
     if delta == 0:
         return "today"
     if delta == 1:
         return "tomorrow"
-    if 2 <= delta <= 6 and target_dt.weekday() >= today_dt.weekday():
+    if 2 <= delta <= 6 and target.weekday() >= base.weekday():
         return f"this {dow}"
     if 7 <= delta <= 13:
-        ordinal = _ordinal(target_dt.day)
-        month = target_dt.strftime("%B")
+        ordinal = _ordinal(target.day)
+        month = target.strftime("%B")
         return f"{dow} the {ordinal} {month}"
 
-    return f"{dow} the {_ordinal(target_dt.day)} {target_dt.strftime('%B')}"
+    return f"{dow} the {_ordinal(target.day)} {target.strftime('%B')}"
 
 
 WEEKDAYS = {name.lower(): i for i, name in enumerate(calendar.day_name)}
@@ -73,9 +82,12 @@ WEEKDAYS = {name.lower(): i for i, name in enumerate(calendar.day_name)}
 def parse_date_phrase(text: str) -> str | None:
     if not text:
         return None
-    lowered = text.lower().strip()
-    base = today_date()
+    # Cached per (phrase, today) so results roll over correctly at midnight.
+    return _parse_date_phrase(text.lower().strip(), today_date())
+
 
+@lru_cache(maxsize=2048)
+def _parse_date_phrase(lowered: str, base: _date) -> str | None:
     if "today" in lowered:
         return base.strftime("%Y-%m-%d")
     if "tomorrow" in lowered:
@@ -93,7 +105,11 @@ def parse_date_phrase(text: str) -> str | None:
 def normalize_time(text: str) -> str | None:
     if not text:
         return None
-    lowered = text.lower().strip()
+    return _normalize_time(text.lower().strip())
+
+
+@lru_cache(maxsize=2048)
+def _normalize_time(lowered: str) -> str | None:
     # tolerate punctuation variants like “4:00 p.m.”
     lowered = lowered.replace(".", "")
 
@@ -137,13 +153,19 @@ def normalize_time(text: str) -> str | None:
 def hhmm_to_12h(hhmm: str) -> str:
     """Convert a 24-hour HH:MM string into a human friendly 12-hour form."""
 
+    spoken = _HHMM_12H.get(hhmm)
+    if spoken is not None:
+        return spoken
     try:
         hour_str, minute_str = hhmm.split(":", 1)
         hour = int(hour_str)
         minute = int(minute_str)
     except Exception:
         return hhmm
+    return _format_12h(hour, minute)
 
+
+def _format_12h(hour: int, minute: int) -> str:
     suffix = "am" if hour < 12 else "pm"
     display_hour = hour % 12
     if display_hour == 0:
@@ -154,6 +176,10 @@ def hhmm_to_12h(hhmm: str) -> str:
     return f"{display_hour}:{minute:02d}{suffix}"
 
 
+# Every canonical HH:MM of the day, so slot times are a single dict lookup.
+_HHMM_12H = {f"{h:02d}:{m:02d}": _format_12h(h, m) for h in range(24) for m in range(60)}
+
+
 def human_time_phrase(hhmm: str) -> str:
     """Wrapper to describe appointment times in natural speech."""
 
@@ -182,6 +208,10 @@ def maybe_prefix_with_filler(
     return parts
 
 
+_SENTENCE_BREAK = re.compile(r"(?<=[\.\!\?])\s+|\n+")
+_CLAUSE_BREAK = re.compile(r"\s*[;,]\s*")
+
+
 def split_for_speech(text: str, max_len: int = 110) -> list[str]:
     """Split text into short, speech-friendly segments."""
 
@@ -192,7 +222,7 @@ def split_for_speech(text: str, max_len: int = 110) -> list[str]:
     segments: list[str] = []
     raw_chunks = [
         chunk.strip()
-        for chunk in re.split(r"(?<=[\.\!\?])\s+|\n+", cleaned)
+        for chunk in _SENTENCE_BREAK.split(cleaned)
         if chunk.strip()
     ]
     if not raw_chunks:
@@ -203,7 +233,7 @@ def split_for_speech(text: str, max_len: int = 110) -> list[str]:
             segments.append(chunk)
             continue
 
-        pieces = [part.strip() for part in re.split(r"\s*[;,]\s*", chunk) if part.strip()]
+        pieces = [part.strip() for part in _CLAUSE_BREAK.split(chunk) if part.strip()]
         if not pieces:
             pieces = [chunk]
 
@@ -230,6 +260,15 @@ def split_for_speech(text: str, max_len: int = 110) -> list[str]:
     return segments
 
 
+_PICK_AMPM = re.compile(r"\d\s*(?:a|p)\s*m")
+_PICK_AMPM_SUFFIX = re.compile(r"(?<=\d)\s*(?:a|p)\s*m")
+_PICK_DIGIT_ALPHA = re.compile(r"(?<=\d)(?=[a-z])|(?<=[a-z])(?=\d)")
+_PICK_COLON = re.compile(r"(\d{1,2})\s*[:]\s*(\d{1,2})")
+_PICK_SPACED = re.compile(r"(\d{1,2})\s+(\d{2})\b")
+_PICK_RUN = re.compile(r"\b(\d{3,4})\b")
+_PICK_HOUR = re.compile(r"\b(\d{1,2})\b")
+
+
 def fuzzy_pick_time(user_text: str, available_hhmm: list[str]) -> str | None:
     """Map fuzzy user input to an available HH:MM slot."""
 
@@ -243,17 +282,15 @@ def fuzzy_pick_time(user_text: str, available_hhmm: list[str]) -> str | None:
 
     lowered = (user_text or "").lower()
     ampm_check = lowered.replace(".", "")
-    has_ampm = bool(re.search(r"\d\s*(?:a|p)\s*m", ampm_check))
+    has_ampm = _PICK_AMPM.search(ampm_check) is not None
 
     norm = normalize_time(user_text)
     if norm and norm in avail_set:
         return norm
 
     # strip am/pm markers that may block digit matching
-    sanitized = ampm_check
-    sanitized = re.sub(r"(?<=\d)\s*(?:a|p)\s*m", "", sanitized)
-    sanitized = re.sub(r"(?<=\d)(?=[a-z])", " ", sanitized)
-    sanitized = re.sub(r"(?<=[a-z])(?=\d)", " ", sanitized)
+    sanitized = _PICK_AMPM_SUFFIX.sub("", ampm_check)
+    sanitized = _PICK_DIGIT_ALPHA.sub(" ", sanitized)
 
     def try_candidates(raw_hour: int, minute: str | None, *, allow_half_hour: bool) -> str | None:
         if raw_hour < 0:
@@ -282,26 +319,23 @@ def fuzzy_pick_time(user_text: str, available_hhmm: list[str]) -> str | None:
         return None
 
     # Pattern like "4:30" or "4 : 30"
-    colon_matches = list(re.finditer(r"(\d{1,2})\s*[:]\s*(\d{1,2})", sanitized))
+    colon_matches = _PICK_COLON.findall(sanitized)
     if colon_matches:
-        h = int(colon_matches[-1].group(1))
-        m = colon_matches[-1].group(2)
-        picked = try_candidates(h, m, allow_half_hour=False)
+        h, m = colon_matches[-1]
+        picked = try_candidates(int(h), m, allow_half_hour=False)
         if picked:
             return picked
 
     # Pattern like "4 30"
-    space_matches = list(re.finditer(r"(\d{1,2})\s+(\d{2})\b", sanitized))
+    space_matches = _PICK_SPACED.findall(sanitized)
     if space_matches:
-        h = int(space_matches[-1].group(1))
-        m = space_matches[-1].group(2)
-        picked = try_candidates(h, m, allow_half_hour=False)
+        h, m = space_matches[-1]
+        picked = try_candidates(int(h), m, allow_half_hour=False)
         if picked:
             return picked
 
     # Contiguous digits such as "430" or "1230"
-    for match in reversed(list(re.finditer(r"\b(\d{3,4})\b", sanitized))):
-        digits = match.group(1)
+    for digits in reversed(_PICK_RUN.findall(sanitized)):
         h = int(digits[:-2])
         m = digits[-2:]
         picked = try_candidates(h, m, allow_half_hour=False)
@@ -309,8 +343,8 @@ def fuzzy_pick_time(user_text: str, available_hhmm: list[str]) -> str | None:
             return picked
 
     # Finally, look at standalone hour digits (take the last one mentioned)
-    for match in reversed(list(re.finditer(r"\b(\d{1,2})\b", sanitized))):
-        h = int(match.group(1))
+    for hour in reversed(_PICK_HOUR.findall(sanitized)):
+        h = int(hour)
         picked = try_candidates(h, None, allow_half_hour=not has_ampm)
         if picked:
             return picked
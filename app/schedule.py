@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 
@@ -12,6 +13,10 @@ BOOKINGS_FILE = DATA_DIR / "bookings.csv"
 
 APPT_TYPES = ["Check-up", "Hygiene", "Whitening", "Extraction", "Filling", "Emergency"]
 
+# Below this many rows, filtering and sorting plain dicts beats building
+# intermediate frames for a handful of slots.
+_SMALL_SCHEDULE_ROWS = 64
+
 
 def schedule_csv_for_profile(profile: str | None) -> Path:
     desired = (profile or "").strip().lower()
@@ -19,33 +24,52 @@ def schedule_csv_for_profile(profile: str | None) -> Path:
         candidate = DATA_DIR / f"schedule_{desired}.csv"
         if candidate.exists():
             return candidate
-    return DEFAULT_SCHEDULE_FILE
+    # Looked up at call time so tests that repoint SCHEDULE_FILE stay isolated.
+    return SCHEDULE_FILE
+
+
+SCHEDULE_COLUMNS = [
+    "date",
+    "weekday",
+    "start_time",
+    "end_time",
+    "status",
+    "patient_name",
+    "appointment_type",
+    "notes",
+]
+
+# Parsed schedules keyed by path; an entry is reused while the file's mtime and
+# size are unchanged, so each call turn does not re-read and re-parse the CSV.
+_SCHEDULE_CACHE: dict[Path, tuple[tuple[int, int], pd.DataFrame]] = {}
 
 
 def load_schedule(profile: str | None = None) -> pd.DataFrame:
     schedule_file = schedule_csv_for_profile(profile)
-    if not schedule_file.exists():
+    try:
+        stat = schedule_file.stat()
+    except FileNotFoundError:
+        _SCHEDULE_CACHE.pop(schedule_file, None)
         return pd.DataFrame()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _SCHEDULE_CACHE.get(schedule_file)
+    if cached is not None and cached[0] == stamp:
+        return cached[1].copy()
     df = pd.read_csv(schedule_file, dtype=str)
-    expected = [
-        "date",
-        "weekday",
-        "start_time",
-        "end_time",
-        "status",
-        "patient_name",
-        "appointment_type",
-        "notes",
-    ]
-    for col in expected:
+    for col in SCHEDULE_COLUMNS:
         if col not in df.columns:
             df[col] = ""
-    return df[expected]
+    df = df[SCHEDULE_COLUMNS]
+    _SCHEDULE_CACHE[schedule_file] = (stamp, df)
+    return df.copy()
 
 
 def save_schedule(df: pd.DataFrame, profile: str | None = None) -> None:
     schedule_file = schedule_csv_for_profile(profile)
     schedule_file.parent.mkdir(parents=True, exist_ok=True)
+    # Drop the entry first: a rewrite within the filesystem's mtime resolution
+    # could otherwise leave a stale frame looking current.
+    _SCHEDULE_CACHE.pop(schedule_file, None)
     df.to_csv(schedule_file, index=False)
 
 
@@ -56,17 +80,47 @@ def list_available(date: str | None = None, limit: int = 6, profile: str | None
         df = load_schedule()
     if df.empty:
         return []
+    if len(df) < _SMALL_SCHEDULE_ROWS:
+        rows = [
+            row
+            for row in df.to_dict(orient="records")
+            if row["status"] == "Available" and (not date or row["date"] == date)
+        ]
+        rows.sort(key=_row_order)
+        return rows[:limit]
     avail = df[df["status"] == "Available"].copy()
     if date:
         avail = avail[avail["date"] == date]
-    try:
-        avail["__t"] = pd.to_datetime(avail["start_time"], format="%H:%M")
-        avail = avail.sort_values("__t").drop(columns=["__t"])
-    except Exception:
-        pass
+    order = _slot_order(avail)
+    if order is not None:
+        avail = avail.iloc[order]
+    else:
+        try:
+            avail["__t"] = pd.to_datetime(avail["start_time"], format="%H:%M")
+            avail = avail.sort_values("__t").drop(columns=["__t"])
+        except Exception:
+            pass
     return avail.head(limit).to_dict(orient="records")
 
 
+def _row_order(row: dict) -> tuple[str, str]:
+    return str(row["date"]), str(row["start_time"]).zfill(5)
+
+
+def _slot_order(slots: pd.DataFrame) -> np.ndarray | None:
+    """Positions of ``slots`` in (date, start_time) order, or None if a value is malformed.
+
+    Dates and times are packed into one integer (YYYYMMDD << 16 | HHMM) so the
+    sort compares machine integers instead of Python strings.
+    """
+    try:
+        days = slots["date"].str.replace("-", "", regex=False).astype(np.int64).to_numpy()
+        times = slots["start_time"].str.replace(":", "", regex=False).astype(np.int64).to_numpy()
+    except (TypeError, ValueError):
+        return None
+    return np.argsort((days << 16) | times, kind="stable")
+
+
 def find_next_available(profile: str | None = None) -> dict | None:
     try:
         df = load_schedule(profile=profile)
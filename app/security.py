@@ -1,55 +1,118 @@
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import Optional, Sequence, Set
+from collections import OrderedDict
+from typing import FrozenSet, Optional, Sequence, Tuple
 from urllib.parse import parse_qs
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import PlainTextResponse, Response
-from starlette.status import HTTP_403_FORBIDDEN
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.status import HTTP_403_FORBIDDEN, HTTP_413_REQUEST_ENTITY_TOO_LARGE
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.twilio_compat import RequestValidator
 
 logger = logging.getLogger(__name__)
 
+# Twilio redelivers identical webhooks on timeouts and 5xx responses; remember
+# recent verdicts so a retry does not redo the HMAC over the same payload.
+VALIDATION_CACHE_SIZE = 1024
+# Twilio webhook bodies are well under 1 KiB; anything far larger is refused
+# before it is buffered or hashed.
+MAX_BODY_SIZE = 16 * 1024
 
-class TwilioRequestValidationMiddleware(BaseHTTPMiddleware):
-    """Middleware that validates Twilio webhook signatures."""
+
+class TwilioRequestValidationMiddleware:
+    """ASGI middleware that validates Twilio webhook signatures.
+
+    Unprotected paths are passed straight through; the body is only read
+    (and replayed to the app) when a signature actually has to be checked.
+    """
 
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         validator: Optional[RequestValidator],
         enabled: bool,
         protected_paths: Optional[Sequence[str]] = None,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.validator = validator
         self.enabled = enabled and validator is not None
-        self.protected_paths: Set[str] = set(protected_paths or [])
+        self.protected_paths: FrozenSet[str] = frozenset(protected_paths or ())
+        self._verdicts: "OrderedDict[Tuple[str, str, bytes], bool]" = OrderedDict()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.enabled or scope["path"] not in self.protected_paths:
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        if not self.enabled or request.url.path not in self.protected_paths:
-            return await call_next(request)
+        request = Request(scope, receive)
+        if _declared_length(request.headers.get("content-length")) > MAX_BODY_SIZE:
+            await _too_large(scope, receive, send)
+            return
 
         signature = request.headers.get("X-Twilio-Signature")
         if not signature:
-            logger.warning("Missing Twilio signature for %s", request.url.path)
-            return PlainTextResponse("Missing Twilio signature", status_code=HTTP_403_FORBIDDEN)
-
-        body = await request.body()
-        params = _parse_body(body, request.headers.get("content-type", ""))
+            logger.warning("Missing Twilio signature for %s", scope["path"])
+            response = PlainTextResponse("Missing Twilio signature", status_code=HTTP_403_FORBIDDEN)
+            await response(scope, receive, send)
+            return
+
+        # Chunked uploads carry no Content-Length, so the cap is enforced while reading too.
+        chunks = []
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > MAX_BODY_SIZE:
+                await _too_large(scope, receive, send)
+                return
+            chunks.append(chunk)
+        body = b"".join(chunks)
         url = str(request.url)
 
-        if not self.validator.validate(url, params, signature):
-            logger.warning("Invalid Twilio signature for %s", request.url.path)
-            return PlainTextResponse("Invalid Twilio signature", status_code=HTTP_403_FORBIDDEN)
+        if not self._verify(signature, url, body, request.headers.get("content-type", "")):
+            logger.warning("Invalid Twilio signature for %s", scope["path"])
+            response = PlainTextResponse("Invalid Twilio signature", status_code=HTTP_403_FORBIDDEN)
+            await response(scope, receive, send)
+            return
+
+        body_sent = False
 
-        async def receive() -> dict:
+        async def replay() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
             return {"type": "http.request", "body": body, "more_body": False}
 
-        new_request = Request(request.scope, receive)
-        return await call_next(new_request)
+        await self.app(scope, replay, send)
+
+    def _verify(self, signature: str, url: str, body: bytes, content_type: str) -> bool:
+        key = (signature, url, hashlib.blake2b(body, digest_size=16).digest())
+        verdict = self._verdicts.get(key)
+        if verdict is not None:
+            self._verdicts.move_to_end(key)
+            return verdict
+        params = _parse_body(body, content_type)
+        verdict = bool(self.validator.validate(url, params, signature))
+        self._verdicts[key] = verdict
+        if len(self._verdicts) > VALIDATION_CACHE_SIZE:
+            self._verdicts.popitem(last=False)
+        return verdict
+
+
+def _declared_length(value: Optional[str]) -> int:
+    try:
+        return int(value) if value else 0
+    except ValueError:
+        return 0
+
+
+async def _too_large(scope: Scope, receive: Receive, send: Send) -> None:
+    logger.warning("Rejected oversized webhook body for %s", scope["path"])
+    response = PlainTextResponse("Request body too large", status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    await response(scope, receive, send)
 
 
 def _parse_body(body: bytes, content_type: str):
@@ -1,18 +1,38 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import random
 import re
+import sys
 import textwrap
-from collections import deque
-from datetime import datetime, timezone
-from threading import Lock
-from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple, Union
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from threading import Event, Lock, Thread
+from time import monotonic
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse, Response
-from twilio.twiml.voice_response import VoiceResponse
+from starlette.background import BackgroundTask
 from xml.etree.ElementTree import ParseError, fromstring
+from xml.sax.saxutils import escape as _xml_text
 
 from app.config import PracticeConfig, Settings, get_settings, get_settings_for_to_number
 from app import nlp, schedule
@@ -69,13 +89,25 @@ CONSENT_LINE = (
     or "By providing your number, you agree to receive appointment confirmations and reminders."
 )
 
-_voice_lock = Lock()
+# Reads and writes of a module global are atomic under the GIL, so the active
+# voice needs no lock.
 _active_voice = VOICE
-_voice_fallback_notified = False
 
 _greeting_lock = Lock()
 _greeting_queue: deque[str] = deque()
 
+# Short-lived cache of free start times per (profile, date) so consecutive
+# booking turns for the same day do not rescan the schedule file.
+_SLOTS_TTL = 5.0
+_SLOTS_CACHE_SIZE = 128
+_SLOTS_CACHE: "OrderedDict[Tuple[str, str, int], Tuple[float, list[str]]]" = OrderedDict()
+_slots_lock = Lock()
+
+# Finished calls are persisted from Starlette's threadpool; the transcript
+# numbering and the bookings.csv header check are read-then-write, so calls
+# completing together are serialised here.
+_finalize_lock = Lock()
+
 MENU_STATEMENT = "I can help with our hours, address, prices, or book you in."
 CLARIFY_PROMPT = "I didn’t quite catch that — would you like our hours, address, prices, or to book an appointment?"
 ANYTHING_ELSE_PROMPT = "Is there anything else I can help you with?"
@@ -85,6 +117,13 @@ BOOKING_NAME_REPROMPT = "Sorry, could I take the name for the appointment?"
 BOOKING_TIME_PROMPT_TEMPLATE = "Thanks {name}. What day and time works for you?"
 BOOKING_TIME_REPROMPT = "What day and time would you like to come in?"
 BOOKING_CONFIRM_REPROMPT = "Should I pencil that appointment in for you?"
+BOOKING_TYPE_PROMPT = (
+    "What type of appointment would you like? For example check-up, hygiene, whitening, or extraction?"
+)
+BOOKING_TYPE_REPROMPT = (
+    "We can do check-up, hygiene, whitening, extraction, filling, or emergency. Which would you like?"
+)
+BOOKING_DATE_REPROMPT = "Which day works best for you? You can say tomorrow or a weekday like Wednesday."
 BOOKING_DECLINED_PROMPT = (
     "No problem, we won't lock anything in just yet. Is there anything else I can help you with?"
 )
@@ -118,6 +157,9 @@ SERVICE_KEY_TO_APPT = {
 
 APPT_TO_SERVICE_KEY = {v: k for k, v in SERVICE_KEY_TO_APPT.items()}
 
+_APPT_EXACT = {appt.lower(): appt for appt in schedule.APPT_TYPES}
+_APPT_LOWER = tuple((appt, appt.lower()) for appt in schedule.APPT_TYPES)
+
 GOODBYES = list(
     settings.practice.closings
     or [
@@ -128,7 +170,7 @@ GOODBYES = list(
 )
 _goodbye_cycle = None
 
-NEGATIVE_RESPONSES = {
+NEGATIVE_RESPONSES = frozenset({
     "no",
     "no thanks",
     "no thank you",
@@ -139,8 +181,8 @@ NEGATIVE_RESPONSES = {
     "were good",
     "nah",
     "nope",
-}
-POSITIVE_RESPONSES = {
+})
+POSITIVE_RESPONSES = frozenset({
     "yes",
     "yeah",
     "yep",
@@ -150,7 +192,11 @@ POSITIVE_RESPONSES = {
     "alright",
     "please",
     "sounds good",
-}
+})
+# One lookup tells a bare yes/no reply apart from everything else.
+_RESPONSE_KIND: Mapping[str, str] = MappingProxyType(
+    {**{phrase: "neg" for phrase in NEGATIVE_RESPONSES}, **{phrase: "pos" for phrase in POSITIVE_RESPONSES}}
+)
 
 ANYTIME_PHRASES = {
     "anytime",
@@ -174,45 +220,9 @@ PromptSegment = Tuple[str, Union[str, Tuple[str, str]]]
 PromptPayload = Union[str, Sequence[PromptSegment]]
 
 
-def _get_active_voice() -> str:
-    with _voice_lock:
-        return _active_voice
-
-
 def _set_active_voice(voice: str) -> None:
     global _active_voice
-    with _voice_lock:
-        _active_voice = voice
-
-
-def _say_with_voice(
-    say_callable: Callable[[str, Optional[str], Optional[str]], Any],
-    message: str,
-    *,
-    preferred_voice: str,
-    language: str,
-    call_sid: Optional[str] = None,
-) -> Any:
-    try:
-        return say_callable(message, voice=preferred_voice, language=language)
-    except Exception:  # pragma: no cover - depends on Twilio SDK behaviour
-        fallback_voice = settings.fallback_voice or "alice"
-        if fallback_voice == preferred_voice:
-            raise
-        _set_active_voice(fallback_voice)
-        global _voice_fallback_notified
-        if not _voice_fallback_notified:
-            logger.warning(
-                "Preferred voice unavailable; falling back",
-                extra={
-                    "call_sid": call_sid,
-                    "preferred_voice": preferred_voice,
-                    "fallback_voice": fallback_voice,
-                },
-                exc_info=True,
-            )
-            _voice_fallback_notified = True
-        return say_callable(message, voice=fallback_voice, language=language)
+    _active_voice = voice
 
 
 def _say_segments(
@@ -221,7 +231,6 @@ def _say_segments(
     *,
     voice: str,
     language: str,
-    call_sid: Optional[str] = None,
 ) -> None:
     segments = nlp.split_for_speech(message, max_len=MAX_SPEECH_CHARS)
     if not segments:
@@ -229,26 +238,178 @@ def _say_segments(
         if not cleaned:
             return
         segments = [cleaned]
-    current_voice = voice
     for segment in segments:
         text = (segment or "").strip()
         if not text:
             continue
-        _say_with_voice(
-            say_callable,
-            text,
-            preferred_voice=current_voice,
-            language=language,
-            call_sid=call_sid,
-        )
-        current_voice = _get_active_voice()
+        say_callable(text, voice=voice, language=language)
+
+
+# Dialogue stages. Interned so the per-turn ``==`` checks short-circuit on
+# identity; plain literals elsewhere (tests, logs) still compare equal.
+STAGE_INTENT = sys.intern("intent")
+STAGE_FOLLOW_UP = sys.intern("follow_up")
+STAGE_COMPLETED = sys.intern("completed")
+STAGE_BOOKING_TYPE = sys.intern("booking_type")
+STAGE_BOOKING_DATE = sys.intern("booking_date")
+STAGE_BOOKING_TIME = sys.intern("booking_time")
+STAGE_BOOKING_NAME = sys.intern("booking_name")
+STAGE_BOOKING_CONFIRM = sys.intern("booking_confirm")
+
+
+@dataclass(slots=True)
+class CallState:
+    call_sid: str
+    transcript: List[str] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    started_at: datetime = field(default_factory=lambda: datetime.now(tz=timezone.utc))
+    last_activity: datetime = field(default_factory=lambda: datetime.now(tz=timezone.utc))
+    stage: str = STAGE_INTENT
+    intent: Optional[str] = None
+    retries: int = 0
+    silence_count: int = 0
+    greeted: bool = False
+    ending: bool = False
+    transcript_file: Optional[str] = None
+    # Tenant settings resolved from the dialled number
+    settings: Optional[Settings] = None
+    profile: Optional[str] = None
+    voice: Optional[str] = None
+    language: Optional[str] = None
+    # Opening/closing rotation and one-off lines
+    opening_line: Optional[str] = None
+    opening_index: int = 0
+    goodbye_index: int = 0
+    disclaimer_said: bool = False
+    menu_said: bool = False
+    consent_said: bool = False
+    # Booking flow
+    caller_name: Optional[str] = None
+    requested_time: Optional[str] = None
+    booking_logged: bool = False
+    booking_appt_type: Optional[str] = None
+    booking_date: Optional[str] = None
+    booking_time: Optional[str] = None
+    booking_available_times: List[str] = field(default_factory=list)
+    booking_suggested_slot: Optional[dict] = None
+    name_attempts: int = 0
+    last_service: Optional[str] = None
+    awaiting_price_service: bool = False
+    # Per-call caches derived from the tenant's practice config
+    info_lines: Optional[Dict[str, str]] = None
+    info_messages: Optional[Dict[str, str]] = None
+    service_info: Optional[Dict[str, str]] = None
+    consent_line: Optional[str] = None
+
+
+class _CallStateShards(MutableMapping[str, CallState]):
+    """CallSid -> CallState map split across independently locked shards.
+
+    Calls never share state, so webhooks for different calls only contend
+    when their CallSids hash to the same shard.
+    """
+
+    def __init__(self, shards: int = 32) -> None:
+        self._maps: List[Dict[str, CallState]] = [{} for _ in range(shards)]
+        self._locks: List[Lock] = [Lock() for _ in range(shards)]
+
+    def shard(self, call_sid: str) -> Tuple[Dict[str, CallState], Lock]:
+        index = hash(call_sid) % len(self._maps)
+        return self._maps[index], self._locks[index]
+
+    def shards(self) -> Iterator[Tuple[Dict[str, CallState], Lock]]:
+        return zip(self._maps, self._locks)
+
+    def __getitem__(self, call_sid: str) -> CallState:
+        return self.shard(call_sid)[0][call_sid]
+
+    def __setitem__(self, call_sid: str, state: CallState) -> None:
+        shard, lock = self.shard(call_sid)
+        with lock:
+            shard[call_sid] = state
+
+    def __delitem__(self, call_sid: str) -> None:
+        shard, lock = self.shard(call_sid)
+        with lock:
+            del shard[call_sid]
+
+    def __iter__(self) -> Iterator[str]:
+        for shard in self._maps:
+            yield from list(shard)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._maps)
+
+    def pop(self, call_sid: str, *default: Any) -> Any:
+        shard, lock = self.shard(call_sid)
+        with lock:
+            return shard.pop(call_sid, *default)
+
+    def clear(self) -> None:
+        for shard, lock in self.shards():
+            with lock:
+                shard.clear()
+
+    def oldest(self) -> Optional[CallState]:
+        # Each shard keeps insertion order, so its first entry is its oldest call.
+        # Shard locks are taken one at a time; callers must not hold any.
+        heads: List[CallState] = []
+        for shard, lock in self.shards():
+            with lock:
+                head = next(iter(shard.values()), None)
+            if head is not None:
+                heads.append(head)
+        return min(heads, key=lambda st: st.started_at, default=None)
+
+
+_call_states = _CallStateShards()
+CALLS = _call_states
 
+# Calls with no webhook for this long are treated as abandoned (their /status
+# callback never arrived) and are finalised from what was collected.
+CALL_STATE_TTL = timedelta(minutes=30)
+CALL_STATE_REAP_INTERVAL = 60.0
+MAX_CALLS = 1000
+
+_reaper_stop = Event()
+
+
+def _reap_call_states(now: Optional[datetime] = None) -> int:
+    cutoff = (now or datetime.now(tz=timezone.utc)) - CALL_STATE_TTL
+    expired: List[CallState] = []
+    for shard, lock in _call_states.shards():
+        with lock:
+            stale = [state for state in shard.values() if state.last_activity < cutoff]
+            for state in stale:
+                del shard[state.call_sid]
+        expired.extend(stale)
+    for state in expired:
+        _finalize_dropped_call(state, "expired")
+    if expired:
+        logger.info("Reaped stale call states", extra={"count": len(expired)})
+    return len(expired)
+
+
+def _reaper_loop() -> None:
+    while not _reaper_stop.wait(CALL_STATE_REAP_INTERVAL):
+        try:
+            _reap_call_states()
+        except Exception:  # pragma: no cover - keep the reaper alive
+            logger.exception("Call state reaper failed")
 
-_state_lock = Lock()
-_call_states: Dict[str, Dict[str, Any]] = {}
-CALLS = _call_states
 
-app = FastAPI()
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    _reaper_stop.clear()
+    reaper = Thread(target=_reaper_loop, name="call-state-reaper", daemon=True)
+    reaper.start()
+    try:
+        yield
+    finally:
+        _reaper_stop.set()
+
+
+app = FastAPI(lifespan=_lifespan)
 
 from app.debug import router as debug_router
 from app.debug_tenant import router as debug_tenant_router
@@ -257,46 +418,39 @@ app.include_router(debug_router)
 app.include_router(debug_tenant_router, tags=["debug"])
 
 validator = RequestValidator(settings.twilio_auth_token) if settings.twilio_auth_token else None
-protected_paths = (
-    "/voice",
-    "/twilio/voice",
-    "/gather-intent",
-    "/gather-booking",
-    "/status",
+PROTECTED_PATHS = frozenset(
+    (
+        "/voice",
+        "/twilio/voice",
+        "/gather-intent",
+        "/gather-booking",
+        "/status",
+    )
 )
 app.add_middleware(
     TwilioRequestValidationMiddleware,
     validator=validator,
     enabled=settings.verify_twilio_signatures,
-    protected_paths=protected_paths,
+    protected_paths=PROTECTED_PATHS,
 )
 
 
-def _initial_state(call_sid: str, form_data: Mapping[str, Any]) -> Dict[str, Any]:
+def _initial_state(
+    call_sid: str,
+    *,
+    from_number: Optional[str] = None,
+    to_number: Optional[str] = None,
+    direction: Optional[str] = None,
+    account_sid: Optional[str] = None,
+) -> CallState:
     metadata = {
-        "from": form_data.get("From"),
-        "to": form_data.get("To"),
-        "direction": form_data.get("Direction"),
-        "account_sid": form_data.get("AccountSid"),
+        "from": from_number,
+        "to": to_number,
+        "direction": direction,
+        "account_sid": account_sid,
     }
     transcript_lines = transcript_init(call_sid)
-    return {
-        "call_sid": call_sid,
-        "transcript": transcript_lines,
-        "retries": 0,
-        "intent": None,
-        "caller_name": None,
-        "requested_time": None,
-        "started_at": datetime.now(tz=timezone.utc),
-        "transcript_file": None,
-        "stage": "intent",
-        "silence_count": 0,
-        "greeted": False,
-        "booking_logged": False,
-        "metadata": metadata,
-        "ending": False,
-        "consent_said": False,
-    }
+    return CallState(call_sid=call_sid, transcript=transcript_lines, metadata=metadata)
 
 
 def _get_state(
@@ -304,60 +458,91 @@ def _get_state(
     form_data: Optional[Mapping[str, Any]] = None,
     *,
     create: bool = True,
-) -> Optional[Dict[str, Any]]:
-    with _state_lock:
-        state = _call_states.get(call_sid)
-        if state is None and create:
-            state = _initial_state(call_sid, dict(form_data or {}))
-            _call_states[call_sid] = state
-        if state is not None and form_data:
-            metadata = state.setdefault("metadata", {})
-            for key, form_key in (
-                ("from", "From"),
-                ("to", "To"),
-                ("direction", "Direction"),
-                ("account_sid", "AccountSid"),
-            ):
-                value = form_data.get(form_key)
-                if value:
-                    metadata[key] = value
-            duration = form_data.get("CallDuration")
-            if duration:
-                metadata["duration_sec"] = duration
-        return state
-
-
-def _pop_state(call_sid: str) -> Optional[Dict[str, Any]]:
-    with _state_lock:
-        return _call_states.pop(call_sid, None)
-
-
-def _state_settings(state: Dict[str, Any]) -> Settings:
-    override = state.get("settings")
-    if isinstance(override, Settings):
+) -> Optional[CallState]:
+    shard, lock = _call_states.shard(call_sid)
+    # Lookups are a single dict.get, which is atomic under the GIL; the shard
+    # lock only serialises inserts and removals against the reaper's scan.
+    state = shard.get(call_sid)
+    if state is None:
+        if not create:
+            return None
+        with lock:
+            state = shard.get(call_sid)
+            created = state is None
+            if created:
+                form = form_data or {}
+                state = _initial_state(
+                    call_sid,
+                    from_number=form.get("From"),
+                    to_number=form.get("To"),
+                    direction=form.get("Direction"),
+                    account_sid=form.get("AccountSid"),
+                )
+                shard[call_sid] = state
+        if created:
+            _enforce_call_capacity()
+    state.last_activity = datetime.now(tz=timezone.utc)
+    if form_data:
+        metadata = state.metadata
+        if value := form_data.get("From"):
+            metadata["from"] = value
+        if value := form_data.get("To"):
+            metadata["to"] = value
+        if value := form_data.get("Direction"):
+            metadata["direction"] = value
+        if value := form_data.get("AccountSid"):
+            metadata["account_sid"] = value
+        if value := form_data.get("CallDuration"):
+            metadata["duration_sec"] = value
+    return state
+
+
+def _enforce_call_capacity() -> None:
+    # Runs outside any shard lock so evicting from another shard cannot deadlock.
+    while len(_call_states) > MAX_CALLS:
+        oldest = _call_states.oldest()
+        if oldest is None:
+            break
+        if _call_states.pop(oldest.call_sid, None) is not None:
+            logger.warning("Evicted call state at capacity", extra={"call_sid": oldest.call_sid})
+            # Called from request handlers, so the file writes go to a thread.
+            Thread(
+                target=_finalize_dropped_call,
+                args=(oldest, "evicted"),
+                name="call-state-evict",
+            ).start()
+
+
+def _pop_state(call_sid: str) -> Optional[CallState]:
+    return _call_states.pop(call_sid, None)
+
+
+def _state_settings(state: CallState) -> Settings:
+    override = state.settings
+    if override is not None:
         return override
     return settings
 
 
-def _state_practice(state: Dict[str, Any]) -> PracticeConfig:
+def _state_practice(state: CallState) -> PracticeConfig:
     return _state_settings(state).practice
 
 
-def _state_voice(state: Dict[str, Any]) -> str:
-    voice = (state.get("voice") or "").strip()
+def _state_voice(state: CallState) -> str:
+    voice = (state.voice or "").strip()
     if voice:
         return voice
     return (_state_settings(state).voice or VOICE).strip()
 
 
-def _state_language(state: Dict[str, Any]) -> str:
-    language = (state.get("language") or "").strip()
+def _state_language(state: CallState) -> str:
+    language = (state.language or "").strip()
     if language:
         return language
     return (_state_settings(state).language or LANGUAGE).strip()
 
 
-def _state_openings(state: Dict[str, Any]) -> list[str]:
+def _state_openings(state: CallState) -> list[str]:
     practice = _state_practice(state)
     options = list(practice.openings or [])
     if options:
@@ -365,7 +550,7 @@ def _state_openings(state: Dict[str, Any]) -> list[str]:
     return list(GREETINGS)
 
 
-def _state_thinking_fillers(state: Dict[str, Any]) -> list[str]:
+def _state_thinking_fillers(state: CallState) -> list[str]:
     practice = _state_practice(state)
     fillers = list(practice.thinking_fillers or [])
     if fillers:
@@ -373,7 +558,7 @@ def _state_thinking_fillers(state: Dict[str, Any]) -> list[str]:
     return list(THINKING_FILLERS)
 
 
-def _state_backchannels(state: Dict[str, Any]) -> list[str]:
+def _state_backchannels(state: CallState) -> list[str]:
     practice = _state_practice(state)
     backchannels = list(practice.backchannels or [])
     if backchannels:
@@ -381,7 +566,7 @@ def _state_backchannels(state: Dict[str, Any]) -> list[str]:
     return list(dialogue_module.HOLDERS)
 
 
-def _state_goodbyes(state: Dict[str, Any]) -> list[str]:
+def _state_goodbyes(state: CallState) -> list[str]:
     practice = _state_practice(state)
     closings = list(practice.closings or [])
     if closings:
@@ -389,9 +574,9 @@ def _state_goodbyes(state: Dict[str, Any]) -> list[str]:
     return GOODBYES
 
 
-def _state_info_lines(state: Dict[str, Any]) -> Dict[str, str]:
-    cached = state.get("_info_lines")
-    if isinstance(cached, dict):
+def _state_info_lines(state: CallState) -> Dict[str, str]:
+    cached = state.info_lines
+    if cached is not None:
         return cached
     practice = _state_practice(state)
     info = {
@@ -399,13 +584,36 @@ def _state_info_lines(state: Dict[str, Any]) -> Dict[str, str]:
         "address": str(practice.address or ""),
         "prices": str(practice.prices or ""),
     }
-    state["_info_lines"] = info
+    state.info_lines = info
     return info
 
 
-def _state_service_info(state: Dict[str, Any]) -> Dict[str, str]:
-    cached = state.get("_service_info")
-    if isinstance(cached, dict):
+def _info_messages(practice: PracticeConfig) -> Dict[str, str]:
+    return {
+        "hours": f"{practice.hours or ''} {ANYTHING_ELSE_PROMPT}",
+        "address": f"{practice.address or ''} {ANYTHING_ELSE_PROMPT}",
+        "prices": f"{practice.prices or ''} {ANYTHING_ELSE_PROMPT}",
+    }
+
+
+_INFO_MESSAGES = _info_messages(settings.practice)
+
+
+def _state_info_messages(state: CallState) -> Dict[str, str]:
+    practice = _state_practice(state)
+    if practice is settings.practice:
+        return _INFO_MESSAGES
+    cached = state.info_messages
+    if cached is not None:
+        return cached
+    messages = _info_messages(practice)
+    state.info_messages = messages
+    return messages
+
+
+def _state_service_info(state: CallState) -> Dict[str, str]:
+    cached = state.service_info
+    if cached is not None:
         return cached
     practice = _state_practice(state)
     mapping: Dict[str, str] = {}
@@ -417,13 +625,13 @@ def _state_service_info(state: Dict[str, Any]) -> Dict[str, str]:
         mapping[lowered] = str_value
         mapping[lowered.replace("-", "")] = str_value
         mapping[lowered.replace(" ", "")] = str_value
-    state["_service_info"] = mapping
+    state.service_info = mapping
     return mapping
 
 
-def _state_consent_line(state: Dict[str, Any]) -> str:
-    cached = state.get("_consent_line")
-    if isinstance(cached, str):
+def _state_consent_line(state: CallState) -> str:
+    cached = state.consent_line
+    if cached is not None:
         return cached
     practice = _state_practice(state)
     consent_line = (
@@ -432,63 +640,64 @@ def _state_consent_line(state: Dict[str, Any]) -> str:
         else None
     )
     consent_line = str(consent_line or CONSENT_LINE)
-    state["_consent_line"] = consent_line
+    state.consent_line = consent_line
     return consent_line
 
 
-def _state_profile(state: Dict[str, Any]) -> str:
-    profile = (state.get("profile") or "").strip().lower()
+def _state_profile(state: CallState) -> str:
+    profile = (state.profile or "").strip().lower()
     if profile:
         return profile
     return _state_settings(state).profile
 
 
-def _maybe_prefix_with_thinking(state: Dict[str, Any], text: PromptPayload, *, chance: float) -> PromptPayload:
+def _maybe_prefix_with_thinking(state: CallState, text: PromptPayload, *, chance: float) -> PromptPayload:
     fillers = _state_thinking_fillers(state)
     return nlp.maybe_prefix_with_filler(text, fillers, chance=chance)
 
 
-def _next_opening_line(state: Dict[str, Any]) -> str:
+def _next_opening_line(state: CallState) -> str:
     options = _state_openings(state)
     if not options:
         return "Hello, how can I help today?"
-    idx = int(state.get("_opening_index", 0))
+    idx = state.opening_index
     greeting = options[idx % len(options)]
-    state["_opening_index"] = idx + 1
+    state.opening_index = idx + 1
     return greeting
 
 
-def _next_goodbye(state: Dict[str, Any]) -> str:
+def _next_goodbye(state: CallState) -> str:
     global _goodbye_cycle
     if _goodbye_cycle is not None:
         return next(_goodbye_cycle)
     closings = _state_goodbyes(state)
     if not closings:
         return "Thanks for calling. Goodbye."
-    idx = int(state.get("_goodbye_index", 0))
+    idx = state.goodbye_index
     message = closings[idx % len(closings)]
-    state["_goodbye_index"] = idx + 1
+    state.goodbye_index = idx + 1
     return message
 
 
-def _apply_call_settings(state: Dict[str, Any], call_settings: Settings) -> None:
-    previous = state.get("settings")
-    same_profile = isinstance(previous, Settings) and previous.profile == call_settings.profile
-    state["settings"] = call_settings
-    state["profile"] = call_settings.profile
-    state["voice"] = call_settings.voice
-    state["language"] = call_settings.language
-    for key in ("_info_lines", "_service_info", "_consent_line"):
-        state.pop(key, None)
+def _apply_call_settings(state: CallState, call_settings: Settings) -> None:
+    previous = state.settings
+    same_profile = previous is not None and previous.profile == call_settings.profile
+    state.settings = call_settings
+    state.profile = call_settings.profile
+    state.voice = call_settings.voice
+    state.language = call_settings.language
+    state.info_lines = None
+    state.info_messages = None
+    state.service_info = None
+    state.consent_line = None
     if not same_profile:
         # Reset rotating indices so new openings/closings start fresh
-        state.pop("_opening_index", None)
-        state.pop("_goodbye_index", None)
-    metadata = state.setdefault("metadata", {})
-    metadata["tenant_profile"] = call_settings.profile
+        state.opening_index = 0
+        state.goodbye_index = 0
+    state.metadata["tenant_profile"] = call_settings.profile
 
 
-def _ensure_state_settings(state: Dict[str, Any], to_number: Optional[str]) -> Settings:
+def _ensure_state_settings(state: CallState, to_number: Optional[str]) -> Settings:
     call_settings = get_settings_for_to_number(to_number)
     _apply_call_settings(state, call_settings)
     return call_settings
@@ -496,139 +705,147 @@ def _ensure_state_settings(state: Dict[str, Any], to_number: Optional[str]) -> S
 
 def _twiml_response(twiml: str) -> Response:
     return Response(content=twiml, media_type="application/xml")
-def _build_opening_prompt(state: Dict[str, Any]) -> str:
-    greeting = state.get("opening_line") or _next_opening_line(state)
-    state.setdefault("opening_line", greeting)
+def _build_opening_prompt(state: CallState) -> str:
+    greeting = state.opening_line or _next_opening_line(state)
+    state.opening_line = greeting
     parts = [greeting]
-    if not state.get("disclaimer_said") and DISCLAIMER_LINE:
+    if not state.disclaimer_said and DISCLAIMER_LINE:
         parts.append(DISCLAIMER_LINE)
-        state["disclaimer_said"] = True
-    if not state.get("menu_said") and MENU_STATEMENT:
+        state.disclaimer_said = True
+    if not state.menu_said and MENU_STATEMENT:
         parts.append(MENU_STATEMENT)
-        state["menu_said"] = True
+        state.menu_said = True
     return " ".join(part for part in parts if part)
 
 
-def create_gather_twiml(
-    prompt: PromptPayload,
-    *,
-    action: str,
-    voice: str,
-    language: str,
-    hints: Optional[str] = None,
-    timeout: int = 5,
-    call_sid: Optional[str] = None,
-) -> str:
-    response = VoiceResponse()
-    gather_kwargs = {
-        "input": "speech",
-        "action": action,
-        "method": "POST",
-        "timeout": timeout,
-        "speech_timeout": "auto",
-        "barge_in": True,
-        "language": language,
-    }
-    if hints:
-        gather_kwargs["hints"] = hints
-    gather = response.gather(**gather_kwargs)
+def _freeze_prompt(prompt: PromptPayload) -> PromptPayload:
+    # The TwiML builders are lru_cached, so segment lists (and list-shaped
+    # segments) are normalised into hashable tuples before the lookup.
     if isinstance(prompt, str):
-        _say_segments(
-            gather.say,
-            prompt,
-            voice=voice,
-            language=language,
-            call_sid=call_sid,
-        )
+        return prompt
+    return tuple((kind, tuple(value) if isinstance(value, list) else value) for kind, value in prompt)
+
+
+# TwiML is emitted from string templates rather than the Twilio SDK's element
+# tree. The markup matches what VoiceResponse produced (sorted attributes,
+# " />" for empty elements) so Twilio sees byte-identical documents.
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>'
+_XML_ATTR_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+_GATHER_ATTRS = (
+    ' action="{action}" bargeIn="true"{hints} input="speech" language="{language}"'
+    ' method="POST" speechTimeout="auto" timeout="{timeout}"'
+)
+_HANGUP_TWIML = f"{_XML_HEADER}<Response><Hangup /></Response>"
+_GOODBYE_TAIL = '<Pause length="0.4" /><Hangup />'
+
+
+def _xml_attrs(pairs: Sequence[Tuple[str, Any]]) -> str:
+    return "".join(
+        f' {name}="{_xml_text(str(value), _XML_ATTR_ENTITIES)}"' for name, value in pairs if value is not None
+    )
+
+
+def _xml_element(tag: str, attrs: str, body: str) -> str:
+    if body:
+        return f"<{tag}{attrs}>{body}</{tag}>"
+    return f"<{tag}{attrs} />"
+
+
+class _SayElement:
+    """A <Say> under construction; SSML children are appended pre-rendered."""
+
+    __slots__ = ("text", "voice", "language", "children")
+
+    def __init__(self, text: str, voice: Optional[str], language: Optional[str]) -> None:
+        self.text = text
+        self.voice = voice
+        self.language = language
+        self.children: List[str] = []
+
+    def render(self) -> str:
+        attrs = _xml_attrs((("language", self.language), ("voice", self.voice)))
+        return _xml_element("Say", attrs, _xml_text(self.text or "") + "".join(self.children))
+
+
+def _render_prompt(prompt: PromptPayload, *, voice: str, language: str) -> str:
+    parts: List[Union[str, _SayElement]] = []
+
+    def say(message: str, voice: Optional[str] = None, language: Optional[str] = None) -> _SayElement:
+        element = _SayElement(message, voice, language)
+        parts.append(element)
+        return element
+
+    if isinstance(prompt, str):
+        _say_segments(say, prompt, voice=voice, language=language)
     else:
         for kind, value in prompt:
             if kind == "say":
-                _say_segments(
-                    gather.say,
-                    value,
-                    voice=voice,
-                    language=language,
-                    call_sid=call_sid,
-                )
+                _say_segments(say, value, voice=voice, language=language)
             elif kind == "ssml":
                 plain_text, ssml_text = _ssml_segment_parts(value)
-                element = _say_with_voice(
-                    gather.say,
-                    plain_text,
-                    preferred_voice=voice,
-                    language=language,
-                    call_sid=call_sid,
-                )
-                if element is not None:
-                    _append_ssml(element, ssml_text)
+                _append_ssml(say(plain_text, voice=voice, language=language), ssml_text)
             elif kind == "pause":
-                gather.pause(length=value)
-    return str(response)
+                parts.append(_xml_element("Pause", _xml_attrs((("length", value),)), ""))
+    return "".join(part if isinstance(part, str) else part.render() for part in parts)
 
 
-def create_goodbye_twiml(
-    message: PromptPayload,
+@lru_cache(maxsize=256)
+def _build_gather_twiml(
+    prompt: PromptPayload,
+    action: str,
+    voice: str,
+    language: str,
+    hints: Optional[str],
+    timeout: int,
+) -> str:
+    attrs = _GATHER_ATTRS.format(
+        action=_xml_text(action, _XML_ATTR_ENTITIES),
+        hints=_xml_attrs((("hints", hints or None),)),
+        language=_xml_text(language, _XML_ATTR_ENTITIES),
+        timeout=timeout,
+    )
+    gather = _xml_element("Gather", attrs, _render_prompt(prompt, voice=voice, language=language))
+    return f"{_XML_HEADER}<Response>{gather}</Response>"
+
+
+@lru_cache(maxsize=256)
+def _build_goodbye_twiml(message: PromptPayload, voice: str, language: str) -> str:
+    body = _render_prompt(message, voice=voice, language=language)
+    return f"{_XML_HEADER}<Response>{body}{_GOODBYE_TAIL}</Response>"
+
+
+def create_gather_twiml(
+    prompt: PromptPayload,
     *,
+    action: str,
     voice: str,
     language: str,
-    call_sid: Optional[str] = None,
+    hints: Optional[str] = None,
+    timeout: int = 5,
 ) -> str:
-    response = VoiceResponse()
-    payload = message
-    if isinstance(payload, str):
-        _say_segments(
-            response.say,
-            payload,
-            voice=voice,
-            language=language,
-            call_sid=call_sid,
-        )
-    else:
-        for kind, value in payload:
-            if kind == "say":
-                _say_segments(
-                    response.say,
-                    value,
-                    voice=voice,
-                    language=language,
-                    call_sid=call_sid,
-                )
-            elif kind == "ssml":
-                plain_text, ssml_text = _ssml_segment_parts(value)
-                element = _say_with_voice(
-                    response.say,
-                    plain_text,
-                    preferred_voice=voice,
-                    language=language,
-                    call_sid=call_sid,
-                )
-                if element is not None:
-                    _append_ssml(element, ssml_text)
-            elif kind == "pause":
-                response.pause(length=value)
-    response.pause(length="0.4")
-    response.hangup()
-    return str(response)
+    return _build_gather_twiml(_freeze_prompt(prompt), action, voice, language, hints, timeout)
+
+
+def create_goodbye_twiml(message: PromptPayload, *, voice: str, language: str) -> str:
+    return _build_goodbye_twiml(_freeze_prompt(message), voice, language)
 
 
 def _hangup_only_response() -> Response:
-    response = VoiceResponse()
-    response.hangup()
-    return _twiml_response(str(response))
+    return _twiml_response(_HANGUP_TWIML)
 
 
-def _remember_agent_line(state: Dict[str, Any], text: str) -> None:
+def _remember_agent_line(state: CallState, text: str) -> None:
     text = (text or "").strip()
     if text:
-        call_sid = (state.get("call_sid") or "").strip()
+        call_sid = (state.call_sid or "").strip()
         if call_sid:
             transcript_add(call_sid, "Agent", text)
 
 
-def _remember_caller_line(state: Dict[str, Any], text: str) -> None:
+def _remember_caller_line(state: CallState, text: str) -> None:
     text = (text or "").strip()
     if text:
-        call_sid = (state.get("call_sid") or "").strip()
+        call_sid = (state.call_sid or "").strip()
         if call_sid:
             transcript_add(call_sid, "Caller", text)
 
@@ -641,7 +858,7 @@ def _ssml_segment_parts(value: Union[str, Tuple[str, str]]) -> Tuple[str, str]:
     return plain_text, value
 
 
-def _append_ssml(element: Any, ssml_text: str) -> None:
+def _append_ssml(element: _SayElement, ssml_text: str) -> None:
     stripped = (ssml_text or "").strip()
     if not stripped:
         return
@@ -649,78 +866,67 @@ def _append_ssml(element: Any, ssml_text: str) -> None:
         node = fromstring(stripped)
     except ParseError:
         return
-    if hasattr(element, "xml") and callable(element.xml):
-        _apply_ssml_to_twilio(element, node)
-        return
-    element.append(node)
+    _render_ssml(node, element.children)
+
 
+def _render_ssml(node: Any, out: List[str]) -> None:
+    """Flatten an SSML tree into the TwiML children Twilio accepts inside <Say>."""
 
-def _apply_ssml_to_twilio(target: Any, node: Any) -> None:
-    def _append_text(container: Any, text: Optional[str]) -> None:
+    def _append_text(container: List[str], text: Optional[str]) -> None:
         if not text:
             return
         cleaned = text.strip()
         if not cleaned:
             return
-        container.append(cleaned)
+        container.append(_xml_text(cleaned))
 
     tag = getattr(node, "tag", "").lower()
     if tag == "speak":
-        _append_text(target, getattr(node, "text", None))
+        _append_text(out, node.text)
         for child in list(node):
-            _apply_ssml_to_twilio(target, child)
-            _append_text(target, getattr(child, "tail", None))
+            _render_ssml(child, out)
+            _append_text(out, child.tail)
         return
 
     if tag == "prosody":
-        kwargs: Dict[str, Any] = {}
-        rate = node.attrib.get("rate")
-        pitch = node.attrib.get("pitch")
-        if rate:
-            kwargs["rate"] = rate
-        if pitch:
-            kwargs["pitch"] = pitch
-        with target.prosody(**kwargs) as prosody:
-            _append_text(prosody, getattr(node, "text", None))
-            for child in list(node):
-                _apply_ssml_to_twilio(prosody, child)
-                _append_text(prosody, getattr(child, "tail", None))
+        attrs = _xml_attrs(
+            (("pitch", node.attrib.get("pitch") or None), ("rate", node.attrib.get("rate") or None))
+        )
+        inner: List[str] = []
+        _append_text(inner, node.text)
+        for child in list(node):
+            _render_ssml(child, inner)
+            _append_text(inner, child.tail)
+        out.append(_xml_element("prosody", attrs, "".join(inner)))
         return
 
     if tag == "break":
-        kwargs: Dict[str, Any] = {}
-        time_value = node.attrib.get("time")
-        strength = node.attrib.get("strength")
-        if time_value:
-            kwargs["time"] = time_value
-        if strength:
-            kwargs["strength"] = strength
-        target.break_(**kwargs)
+        attrs = _xml_attrs(
+            (("strength", node.attrib.get("strength") or None), ("time", node.attrib.get("time") or None))
+        )
+        out.append(_xml_element("break", attrs, ""))
         return
 
     if tag == "say-as":
-        kwargs: Dict[str, Any] = {}
-        interpret = node.attrib.get("interpret-as")
-        role = node.attrib.get("role")
-        fmt = node.attrib.get("format")
-        if interpret:
-            kwargs["interpret_as"] = interpret
-        if role:
-            kwargs["role"] = role
-        if fmt:
-            kwargs["format"] = fmt
-        words = (getattr(node, "text", "") or "").strip()
+        words = (node.text or "").strip()
         if words:
-            target.say_as(words, **kwargs)
+            attrs = _xml_attrs(
+                (
+                    ("format", node.attrib.get("format") or None),
+                    ("interpret-as", node.attrib.get("interpret-as") or None),
+                    ("role", node.attrib.get("role") or None),
+                )
+            )
+            out.append(_xml_element("say-as", attrs, _xml_text(words)))
         for child in list(node):
-            _apply_ssml_to_twilio(target, child)
-            _append_text(target, getattr(child, "tail", None))
+            _render_ssml(child, out)
+            _append_text(out, child.tail)
         return
 
-    _append_text(target, getattr(node, "text", None))
+    _append_text(out, node.text)
     for child in list(node):
-        _apply_ssml_to_twilio(target, child)
-        _append_text(target, getattr(child, "tail", None))
+        _render_ssml(child, out)
+        _append_text(out, child.tail)
 
 
 def _prompt_to_text(prompt: PromptPayload) -> str:
@@ -747,7 +953,7 @@ def _with_ack(text: str, chance: float = 0.7) -> str:
     return f"{holder} {text}"
 
 
-def _lookup_service_price(state: Dict[str, Any], service_key: Optional[str]) -> Optional[str]:
+def _lookup_service_price(state: CallState, service_key: Optional[str]) -> Optional[str]:
     if not service_key:
         return None
     lowered = service_key.lower()
@@ -761,37 +967,37 @@ def _lookup_service_price(state: Dict[str, Any], service_key: Optional[str]) ->
     return service_info.get(key_no_space)
 
 
-def _respond_with_price_details(state: Dict[str, Any], service_key: str) -> Response:
+def _respond_with_price_details(state: CallState, service_key: str) -> Response:
     info_lines = _state_info_lines(state)
     info_text = _lookup_service_price(state, service_key) or info_lines.get("prices", "")
     follow_up = "Would you like to book that?"
     message = f"{info_text} {follow_up}".strip()
     payload = _maybe_prefix_with_thinking(state, _with_ack(message, 0.85), chance=0.4)
-    state["intent"] = "prices"
-    state["stage"] = "follow_up"
-    state["retries"] = 0
-    state["last_service"] = service_key
-    state.pop("awaiting_price_service", None)
+    state.intent = "prices"
+    state.stage = STAGE_FOLLOW_UP
+    state.retries = 0
+    state.last_service = service_key
+    state.awaiting_price_service = False
     return _respond_with_gather(state, payload)
 
 
-def _prompt_for_service_choice(state: Dict[str, Any]) -> Response:
+def _prompt_for_service_choice(state: CallState) -> Response:
     question = "Which treatment did you have in mind — check-up, hygiene, whitening, or extraction?"
     prompt = _with_ack(question, 0.75)
-    state["awaiting_price_service"] = True
-    state["intent"] = "prices"
-    state["stage"] = "follow_up"
+    state.awaiting_price_service = True
+    state.intent = "prices"
+    state.stage = STAGE_FOLLOW_UP
     return _respond_with_gather(state, prompt)
 
 
-def _handle_price_service_follow_up(state: Dict[str, Any], user_input: str) -> Response:
+def _handle_price_service_follow_up(state: CallState, user_input: str) -> Response:
     service_key = nlp.detect_service(user_input)
     if service_key:
         return _respond_with_price_details(state, service_key)
     apology = "Sorry, was that for check-up, hygiene, whitening, or extraction?"
     prompt = _with_ack(apology, 0.7)
-    state["awaiting_price_service"] = True
-    state["stage"] = "follow_up"
+    state.awaiting_price_service = True
+    state.stage = STAGE_FOLLOW_UP
     return _respond_with_gather(state, prompt)
 
 
@@ -805,7 +1011,7 @@ def _clarifier_prompt(confidence: Optional[float]) -> str:
 
 
 def _respond_with_gather(
-    state: Dict[str, Any],
+    state: CallState,
     prompt: PromptPayload,
     *,
     action: str = "/gather-intent",
@@ -820,23 +1026,22 @@ def _respond_with_gather(
     twiml = create_gather_twiml(
         prompt,
         action=action,
-        voice=_get_active_voice(),
+        voice=voice,
         language=language,
         hints=hints,
         timeout=int(timeout),
-        call_sid=state.get("call_sid"),
     )
     return _twiml_response(twiml)
 
 
-def _respond_with_goodbye(state: Dict[str, Any]) -> Response:
+def _respond_with_goodbye(state: CallState) -> Response:
     message = _next_goodbye(state)
     _remember_agent_line(state, message)
-    state["stage"] = "completed"
-    state["ending"] = True
+    state.stage = STAGE_COMPLETED
+    state.ending = True
     logger.info(
         "Ending call",
-        extra={"call_sid": state.get("call_sid"), "goodbye_text": message},
+        extra={"call_sid": state.call_sid, "goodbye_text": message},
     )
     ssml = textwrap.dedent(
         f"""
@@ -851,36 +1056,31 @@ def _respond_with_goodbye(state: Dict[str, Any]) -> Response:
     return _twiml_response(
         create_goodbye_twiml(
             [("ssml", (message, ssml))],
-            voice=_get_active_voice(),
+            voice=voice,
             language=language,
-            call_sid=state.get("call_sid"),
         )
     )
 
 
 def _booking_type_prompt() -> str:
-    return _with_ack(
-        "What type of appointment would you like? For example check-up, hygiene, whitening, or extraction?",
-        0.85,
-    )
+    return _with_ack(BOOKING_TYPE_PROMPT, 0.85)
 
 
 def _booking_type_reprompt() -> str:
-    return _with_ack(
-        "We can do check-up, hygiene, whitening, extraction, filling, or emergency. Which would you like?",
-        0.85,
-    )
+    return _with_ack(BOOKING_TYPE_REPROMPT, 0.85)
+
+
+@lru_cache(maxsize=32)
+def _booking_date_base(appt_type: str) -> str:
+    return f"Great, a {appt_type} — what day works best for you?"
 
 
 def _booking_date_prompt(appt_type: str) -> str:
-    return _with_ack(f"Great, a {appt_type} — what day works best for you?", 0.85)
+    return _with_ack(_booking_date_base(appt_type), 0.85)
 
 
 def _booking_date_reprompt() -> str:
-    return _with_ack(
-        "Which day works best for you? You can say tomorrow or a weekday like Wednesday.",
-        0.8,
-    )
+    return _with_ack(BOOKING_DATE_REPROMPT, 0.8)
 
 
 def _format_times(slots: Sequence[str]) -> str:
@@ -900,7 +1100,7 @@ def _format_times(slots: Sequence[str]) -> str:
     return ", ".join(spoken[:-1]) + f", or {spoken[-1]}"
 
 
-def _booking_time_prompt(state: Dict[str, Any], date: str, slots: Sequence[str]) -> PromptPayload:
+def _booking_time_prompt(state: CallState, date: str, slots: Sequence[str]) -> PromptPayload:
     joined = _format_times(list(slots))
     if not joined:
         message = _with_ack(
@@ -941,7 +1141,7 @@ def _booking_time_prompt(state: Dict[str, Any], date: str, slots: Sequence[str])
     return [("ssml", (plain_text, ssml))]
 
 
-def _booking_time_reprompt(state: Dict[str, Any], slots: Sequence[str]) -> PromptPayload:
+def _booking_time_reprompt(state: CallState, slots: Sequence[str]) -> PromptPayload:
     cleaned = [f"{nlp.human_time_phrase(slot)} at {slot}" for slot in slots if slot]
     if cleaned:
         preview = ", ".join(cleaned[:3])
@@ -955,14 +1155,18 @@ def _booking_time_reprompt(state: Dict[str, Any], slots: Sequence[str]) -> Promp
     return _maybe_prefix_with_thinking(state, prompt, chance=0.5)
 
 
+@lru_cache(maxsize=32)
+def _booking_name_base(time: str) -> str:
+    return f"Okay, {nlp.hhmm_to_12h(time)} noted. And your name please?"
+
+
 def _booking_name_prompt(time: str) -> str:
-    base = f"Okay, {nlp.hhmm_to_12h(time)} noted. And your name please?"
-    return _with_ack(base, 0.75)
+    return _with_ack(_booking_name_base(time), 0.75)
 
 
-def _booking_confirm_prompt(state: Dict[str, Any]) -> PromptPayload:
-    booking_date = state.get("booking_date")
-    booking_time = state.get("booking_time")
+def _booking_confirm_prompt(state: CallState) -> PromptPayload:
+    booking_date = state.booking_date
+    booking_time = state.booking_time
     if booking_date and booking_time:
         when_text = format_slot_time(booking_date, booking_time)
         connector = "on"
@@ -976,17 +1180,17 @@ def _booking_confirm_prompt(state: Dict[str, Any]) -> PromptPayload:
         when_text = "the time we discussed"
         connector = "at"
     message = (
-        f"Great, {state['caller_name']}. Shall I book you in for {state['booking_appt_type']} "
+        f"Great, {state.caller_name}. Shall I book you in for {state.booking_appt_type} "
         f"{connector} {when_text}?"
     )
     message = _with_ack(message, 0.7)
     return _maybe_prefix_with_thinking(state, message, chance=0.6)
 
 
-def _booking_confirmed_message(state: Dict[str, Any]) -> PromptPayload:
-    date_value = state.get("booking_date")
-    time_value = state.get("booking_time")
-    appointment_type = state.get("booking_appt_type") or "appointment"
+def _booking_confirmed_message(state: CallState) -> PromptPayload:
+    date_value = state.booking_date
+    time_value = state.booking_time
+    appointment_type = state.booking_appt_type or "appointment"
     appointment_phrase = f"{appointment_type} appointment" if appointment_type else "appointment"
     time_ssml = time_value or (nlp.hhmm_to_12h(time_value or "") or "")
     date_ssml = ""
@@ -1029,7 +1233,7 @@ def _booking_confirmed_message(state: Dict[str, Any]) -> PromptPayload:
     )
     parts: list[PromptSegment] = []
     parts.append(("ssml", (plain_text, ssml)))
-    if not state.get("consent_said"):
+    if not state.consent_said:
         practice = _state_practice(state)
         snippet = consent_snippet(practice)
         if snippet:
@@ -1037,33 +1241,53 @@ def _booking_confirmed_message(state: Dict[str, Any]) -> PromptPayload:
         consent_line = _state_consent_line(state)
         if consent_line:
             parts.append(("say", consent_line))
-        state["consent_said"] = True
+        state.consent_said = True
     parts.append(("say", _with_ack(ANYTHING_ELSE_PROMPT, 0.6)))
     return parts
 
 
-def _reset_booking_context(state: Dict[str, Any]) -> None:
-    state["intent"] = "booking"
-    state["booking_appt_type"] = None
-    state["booking_date"] = None
-    state["booking_time"] = None
-    state["booking_available_times"] = []
-    state["requested_time"] = None
-    state["caller_name"] = None
-    state["booking_logged"] = False
-    state["booking_suggested_slot"] = None
+def _reset_booking_context(state: CallState) -> None:
+    state.intent = "booking"
+    state.booking_appt_type = None
+    state.booking_date = None
+    state.booking_time = None
+    state.booking_available_times = []
+    state.requested_time = None
+    state.caller_name = None
+    state.booking_logged = False
+    state.booking_suggested_slot = None
 
 
-def _available_slots_for_date(state: Dict[str, Any], date: str, limit: int = 6) -> list[str]:
+def _available_slots_for_date(state: CallState, date: str, limit: int = 6) -> list[str]:
     profile = _state_profile(state)
+    key = (profile, date, limit)
+    now = monotonic()
+    with _slots_lock:
+        entry = _SLOTS_CACHE.get(key)
+        if entry and now - entry[0] < _SLOTS_TTL:
+            _SLOTS_CACHE.move_to_end(key)
+            return list(entry[1])
     try:
         slots = schedule.list_available(date=date, limit=limit, profile=profile)
     except TypeError:
         slots = schedule.list_available(date=date, limit=limit)
-    return [slot["start_time"] for slot in slots]
+    times = [slot["start_time"] for slot in slots]
+    with _slots_lock:
+        _SLOTS_CACHE[key] = (now, times)
+        _SLOTS_CACHE.move_to_end(key)
+        while len(_SLOTS_CACHE) > _SLOTS_CACHE_SIZE:
+            _SLOTS_CACHE.popitem(last=False)
+    return list(times)
 
 
-def _next_available_slot(state: Dict[str, Any]) -> Optional[dict]:
+def _invalidate_slots(state: CallState, date: str) -> None:
+    profile = _state_profile(state)
+    with _slots_lock:
+        for key in [key for key in _SLOTS_CACHE if key[:2] == (profile, date)]:
+            del _SLOTS_CACHE[key]
+
+
+def _next_available_slot(state: CallState) -> Optional[dict]:
     profile = _state_profile(state)
     try:
         return schedule.find_next_available(profile=profile)
@@ -1078,23 +1302,23 @@ def _match_appointment_type(text: str) -> Optional[str]:
     cleaned = (text or "").strip().lower()
     if not cleaned:
         return None
-    for appt in schedule.APPT_TYPES:
-        if cleaned == appt.lower():
-            return appt
-    for appt in schedule.APPT_TYPES:
-        if cleaned in appt.lower():
+    exact = _APPT_EXACT.get(cleaned)
+    if exact:
+        return exact
+    for appt, lowered in _APPT_LOWER:
+        if cleaned in lowered:
             return appt
     return None
 
 
-def _handle_availability_request(state: Dict[str, Any], user_input: str) -> Response:
+def _handle_availability_request(state: CallState, user_input: str) -> Response:
     date = nlp.parse_date_phrase(user_input)
     if not date:
-        state["stage"] = "booking_date"
-        state["silence_count"] = 0
-        state["retries"] = 0
-        state["booking_date"] = None
-        state["booking_available_times"] = []
+        state.stage = STAGE_BOOKING_DATE
+        state.silence_count = 0
+        state.retries = 0
+        state.booking_date = None
+        state.booking_available_times = []
         prompt = _maybe_prefix_with_thinking(
             state,
             _with_ack(
@@ -1115,40 +1339,52 @@ def _handle_availability_request(state: Dict[str, Any], user_input: str) -> Resp
             )
         else:
             message = _with_ack("Sorry, I can’t see any free times right now.", 0.7)
-        state["booking_date"] = date
-        state["booking_available_times"] = []
-        state["stage"] = "booking_date"
-        state["silence_count"] = 0
-        state["retries"] = 0
+        state.booking_date = date
+        state.booking_available_times = []
+        state.stage = STAGE_BOOKING_DATE
+        state.silence_count = 0
+        state.retries = 0
         return _respond_with_gather(
             state,
             _maybe_prefix_with_thinking(state, message, chance=0.6),
             action="/gather-booking",
         )
 
-    state.setdefault("intent", "booking")
-    state["booking_date"] = date
-    state["booking_available_times"] = slots
-    state["stage"] = "booking_time"
-    state["silence_count"] = 0
-    state["retries"] = 0
+    state.booking_date = date
+    state.booking_available_times = slots
+    state.stage = STAGE_BOOKING_TIME
+    state.silence_count = 0
+    state.retries = 0
     prompt = _booking_time_prompt(state, date, slots)
     return _respond_with_gather(state, prompt, action="/gather-booking")
 
 
+_NAME_PREFIX_RE = re.compile(r"my name is|it's|its|this is|i am|i'm|call me", re.IGNORECASE)
+_NAME_TOKEN_RE = re.compile(r"[a-zA-Z]+")
+
+
 def _extract_first_name(text: str) -> Optional[str]:
     cleaned = text.strip()
-    if not cleaned:
-        return None
-    lowered = cleaned.lower()
-    for prefix in ("my name is", "it's", "its", "this is", "i am", "i'm", "call me"):
-        if lowered.startswith(prefix):
-            cleaned = cleaned[len(prefix) :].strip()
-            break
-    parts = [piece for piece in re.split(r"[^a-zA-Z]+", cleaned) if piece]
-    if not parts:
+    # The prefix is matched separately from the name so a bare "my name is"
+    # yields nothing rather than backtracking to capture "my".
+    prefix = _NAME_PREFIX_RE.match(cleaned)
+    if prefix:
+        cleaned = cleaned[prefix.end() :]
+    token = _NAME_TOKEN_RE.search(cleaned)
+    if not token:
         return None
-    return parts[0].capitalize()
+    return token.group().capitalize()
+
+
+async def _classify_speech(text: str) -> Tuple[Optional[str], Dict[str, str]]:
+    kind = _RESPONSE_KIND.get(text.lower().strip())
+    if kind == "pos":
+        return "affirm", {}
+    if kind == "neg":
+        return "goodbye", {}
+    # The fuzzy classifier is pure Python; run it in a worker thread so a
+    # long utterance does not stall other calls on the event loop.
+    return await asyncio.to_thread(classify_with_slots, text)
 
 
 def _safe_int(value: Any) -> int:
@@ -1159,20 +1395,20 @@ def _safe_int(value: Any) -> int:
 
 
 def _handle_silence(
-    state: Dict[str, Any],
+    state: CallState,
     *,
     reprompt: PromptPayload,
     action: str = "/gather-intent",
 ) -> Response:
-    state["silence_count"] = state.get("silence_count", 0) + 1
-    state["retries"] = state.get("retries", 0) + 1
+    state.silence_count += 1
+    state.retries += 1
     logger.info(
         "Silence detected",
-        extra={"call_sid": state.get("call_sid"), "count": state["silence_count"], "stage": state.get("stage")},
+        extra={"call_sid": state.call_sid, "count": state.silence_count, "stage": state.stage},
     )
     practice = _state_practice(state)
     max_reprompts = max(int(practice.max_silence_reprompts or 1), 1)
-    if state["silence_count"] <= max_reprompts:
+    if state.silence_count <= max_reprompts:
         prompt = reprompt
         if isinstance(prompt, str):
             if prompt == CLARIFY_PROMPT:
@@ -1187,44 +1423,60 @@ def _handle_silence(
     return _respond_with_goodbye(state)
 
 
-def _start_booking(state: Dict[str, Any], initial_text: Optional[str] = None) -> Response:
+def _start_booking(state: CallState, initial_text: Optional[str] = None) -> Response:
     _reset_booking_context(state)
-    state["silence_count"] = 0
-    state["retries"] = 0
+    state.silence_count = 0
+    state.retries = 0
 
-    detected_service = nlp.detect_service(initial_text or "") or state.get("last_service")
+    detected_service = nlp.detect_service(initial_text or "") or state.last_service
     inline_type = extract_appt_type(initial_text or "")
     if not inline_type and detected_service:
         inline_type = SERVICE_KEY_TO_APPT.get(detected_service)
     if inline_type:
-        state["booking_appt_type"] = inline_type
+        state.booking_appt_type = inline_type
         mapped_service = APPT_TO_SERVICE_KEY.get(inline_type)
         if mapped_service:
-            state["last_service"] = mapped_service
+            state.last_service = mapped_service
         elif detected_service:
-            state["last_service"] = detected_service
-        state["stage"] = "booking_date"
+            state.last_service = detected_service
+        state.stage = STAGE_BOOKING_DATE
         logger.info(
             "Booking flow started",
-            extra={"call_sid": state.get("call_sid"), "prefill_type": inline_type},
+            extra={"call_sid": state.call_sid, "prefill_type": inline_type},
         )
         return _respond_with_gather(state, _booking_date_prompt(inline_type), action="/gather-booking")
 
-    state["stage"] = "booking_type"
-    logger.info("Booking flow started", extra={"call_sid": state.get("call_sid")})
+    state.stage = STAGE_BOOKING_TYPE
+    logger.info("Booking flow started", extra={"call_sid": state.call_sid})
     return _respond_with_gather(state, _booking_type_prompt(), action="/gather-booking")
 
 
+def _turn_kind(intent: Optional[str], lowered: str) -> str:
+    """Classify a booking-stage reply once so each handler can branch on a tag."""
+    reply = _RESPONSE_KIND.get(lowered)
+    if intent == "goodbye" or reply == "neg":
+        return "goodbye"
+    if intent in BASIC_INFO_INTENTS:
+        return "info"
+    if intent == "availability":
+        return "availability"
+    if intent == "booking":
+        return "booking"
+    if intent == "affirm" or reply == "pos":
+        return "affirm"
+    return "other"
+
+
 def _handle_primary_intent(
-    state: Dict[str, Any], intent: Optional[str], user_input: str, confidence: Optional[float] = None
+    state: CallState, intent: Optional[str], user_input: str, confidence: Optional[float] = None
 ) -> Response:
     practice = _state_practice(state)
     if intent == "quote" and not practice.price_items:
         intent = "prices"
-    lowered = user_input.lower().strip()
-    if state.get("awaiting_price_service"):
+    reply = _RESPONSE_KIND.get(user_input.lower().strip())
+    if state.awaiting_price_service:
         return _handle_price_service_follow_up(state, user_input)
-    if intent == "goodbye" or lowered in NEGATIVE_RESPONSES:
+    if intent == "goodbye" or reply == "neg":
         return _respond_with_goodbye(state)
     if intent in GARAGE_INFO_INTENTS and practice.price_items:
         info_text = info_for_intent(practice, intent).strip()
@@ -1236,54 +1488,52 @@ def _handle_primary_intent(
             )
             message = _with_ack(f"{info_text} {follow_up}".strip(), 0.85)
             payload = _maybe_prefix_with_thinking(state, message, chance=0.4)
-            state["intent"] = intent
-            state["stage"] = "follow_up"
-            state["retries"] = 0
-            state.pop("awaiting_price_service", None)
+            state.intent = intent
+            state.stage = STAGE_FOLLOW_UP
+            state.retries = 0
+            state.awaiting_price_service = False
             logger.info(
                 "Providing information",
-                extra={"call_sid": state.get("call_sid"), "intent": intent},
+                extra={"call_sid": state.call_sid, "intent": intent},
             )
             return _respond_with_gather(state, payload)
     if intent == "prices":
-        service_key = nlp.detect_service(user_input) or state.get("last_service")
+        service_key = nlp.detect_service(user_input) or state.last_service
         if service_key:
             return _respond_with_price_details(state, service_key)
         return _prompt_for_service_choice(state)
     if intent in BASIC_INFO_INTENTS:
-        info_lines = _state_info_lines(state)
-        info_text = info_lines.get(intent, "")
-        message = _with_ack(f"{info_text} {ANYTHING_ELSE_PROMPT}", 0.85)
+        message = _with_ack(_state_info_messages(state)[intent], 0.85)
         payload = _maybe_prefix_with_thinking(state, message, chance=0.4)
-        state["intent"] = intent
-        state["stage"] = "follow_up"
-        state["retries"] = 0
-        logger.info("Providing information", extra={"call_sid": state.get("call_sid"), "intent": intent})
+        state.intent = intent
+        state.stage = STAGE_FOLLOW_UP
+        state.retries = 0
+        logger.info("Providing information", extra={"call_sid": state.call_sid, "intent": intent})
         return _respond_with_gather(state, payload)
     if intent == "availability":
-        if state.get("intent") != "booking":
+        if state.intent != "booking":
             _reset_booking_context(state)
         return _handle_availability_request(state, user_input)
     if intent == "booking":
         return _start_booking(state, user_input)
-    if intent == "affirm" or lowered in POSITIVE_RESPONSES:
-        state["stage"] = "intent"
+    if intent == "affirm" or reply == "pos":
+        state.stage = STAGE_INTENT
         return _respond_with_gather(state, _with_ack(CLARIFY_PROMPT, 0.65))
-    state["intent"] = state.get("intent") or "other"
+    state.intent = state.intent or "other"
     prompt = _clarifier_prompt(confidence)
     return _respond_with_gather(state, prompt)
 
 
 def _handle_follow_up(
-    state: Dict[str, Any], intent: Optional[str], user_input: str, confidence: Optional[float] = None
+    state: CallState, intent: Optional[str], user_input: str, confidence: Optional[float] = None
 ) -> Response:
     practice = _state_practice(state)
     if intent == "quote" and not practice.price_items:
         intent = "prices"
-    lowered = user_input.lower().strip()
-    if state.get("awaiting_price_service"):
+    reply = _RESPONSE_KIND.get(user_input.lower().strip())
+    if state.awaiting_price_service:
         return _handle_price_service_follow_up(state, user_input)
-    if intent == "goodbye" or lowered in NEGATIVE_RESPONSES:
+    if intent == "goodbye" or reply == "neg":
         return _respond_with_goodbye(state)
     if intent in GARAGE_INFO_INTENTS and practice.price_items:
         info_text = info_for_intent(practice, intent).strip()
@@ -1295,103 +1545,106 @@ def _handle_follow_up(
             )
             message = _with_ack(f"{info_text} {follow_up}".strip(), 0.85)
             payload = _maybe_prefix_with_thinking(state, message, chance=0.4)
-            state["intent"] = intent
-            state["stage"] = "follow_up"
-            state["retries"] = 0
-            state.pop("awaiting_price_service", None)
+            state.intent = intent
+            state.stage = STAGE_FOLLOW_UP
+            state.retries = 0
+            state.awaiting_price_service = False
             logger.info(
                 "Providing information",
-                extra={"call_sid": state.get("call_sid"), "intent": intent},
+                extra={"call_sid": state.call_sid, "intent": intent},
             )
             return _respond_with_gather(state, payload)
     if intent == "availability":
-        if state.get("intent") != "booking":
+        if state.intent != "booking":
             _reset_booking_context(state)
         return _handle_availability_request(state, user_input)
     if intent == "prices":
-        service_key = nlp.detect_service(user_input) or state.get("last_service")
+        service_key = nlp.detect_service(user_input) or state.last_service
         if service_key:
             return _respond_with_price_details(state, service_key)
         return _prompt_for_service_choice(state)
     if intent in BASIC_INFO_INTENTS or intent == "booking":
-        state["stage"] = "intent"
+        state.stage = STAGE_INTENT
         return _handle_primary_intent(state, intent, user_input, confidence=confidence)
-    if intent == "affirm" or lowered in POSITIVE_RESPONSES:
-        state["stage"] = "intent"
+    if intent == "affirm" or reply == "pos":
+        state.stage = STAGE_INTENT
         return _respond_with_gather(state, _with_ack(CLARIFY_PROMPT, 0.65))
-    state["stage"] = "intent"
+    state.stage = STAGE_INTENT
     prompt = _clarifier_prompt(confidence)
     return _respond_with_gather(state, prompt)
 
 
 def _handle_booking_type(
-    state: Dict[str, Any], user_input: str, intent: Optional[str], confidence: Optional[float] = None
+    state: CallState, user_input: str, intent: Optional[str], confidence: Optional[float] = None
 ) -> Response:
-    if intent == "goodbye":
+    lowered = user_input.lower().strip()
+    kind = _turn_kind(intent, lowered)
+    if kind == "goodbye":
         return _respond_with_goodbye(state)
-    if intent in BASIC_INFO_INTENTS:
-        state["stage"] = "intent"
+    if kind == "info":
+        state.stage = STAGE_INTENT
         return _handle_primary_intent(state, intent, user_input, confidence=confidence)
-    if intent == "availability":
+    if kind == "availability":
         return _handle_availability_request(state, user_input)
 
     match = _match_appointment_type(user_input)
     if not match:
-        state["retries"] += 1
+        state.retries += 1
         return _respond_with_gather(state, _booking_type_reprompt(), action="/gather-booking")
 
-    state["booking_appt_type"] = match
-    state["silence_count"] = 0
-    state["retries"] = 0
+    state.booking_appt_type = match
+    state.silence_count = 0
+    state.retries = 0
     logger.info(
         "Captured appointment type",
-        extra={"call_sid": state.get("call_sid"), "appointment_type": match},
+        extra={"call_sid": state.call_sid, "appointment_type": match},
     )
-    if state.get("booking_date") and state.get("booking_time"):
-        state["stage"] = "booking_name"
-        return _respond_with_gather(state, _booking_name_prompt(state["booking_time"]), action="/gather-booking")
-    state["stage"] = "booking_date"
+    if state.booking_date and state.booking_time:
+        state.stage = STAGE_BOOKING_NAME
+        return _respond_with_gather(state, _booking_name_prompt(state.booking_time), action="/gather-booking")
+    state.stage = STAGE_BOOKING_DATE
     return _respond_with_gather(state, _booking_date_prompt(match), action="/gather-booking")
 
 
 def _handle_booking_date(
-    state: Dict[str, Any], user_input: str, intent: Optional[str], confidence: Optional[float] = None
+    state: CallState, user_input: str, intent: Optional[str], confidence: Optional[float] = None
 ) -> Response:
     lowered = user_input.lower().strip()
-    if intent == "goodbye" or lowered in NEGATIVE_RESPONSES:
+    kind = _turn_kind(intent, lowered)
+    if kind == "goodbye":
         return _respond_with_goodbye(state)
-    if intent in BASIC_INFO_INTENTS:
-        state["stage"] = "intent"
+    if kind == "info":
+        state.stage = STAGE_INTENT
         return _handle_primary_intent(state, intent, user_input, confidence=confidence)
-    if intent == "availability":
+    if kind == "availability":
         return _handle_availability_request(state, user_input)
 
-    suggested = state.get("booking_suggested_slot")
-    if suggested and (intent == "affirm" or lowered in POSITIVE_RESPONSES):
-        state["booking_date"] = suggested["date"]
-        state["booking_time"] = suggested["start_time"]
-        state["booking_available_times"] = [suggested["start_time"]]
-        state["requested_time"] = f"{suggested['date']} {suggested['start_time']}"
-        state["booking_suggested_slot"] = None
-        state["stage"] = "booking_name"
-        state["silence_count"] = 0
+    suggested = state.booking_suggested_slot
+    if suggested and kind == "affirm":
+        state.booking_date = suggested["date"]
+        state.booking_time = suggested["start_time"]
+        state.booking_available_times = [suggested["start_time"]]
+        state.requested_time = f"{suggested['date']} {suggested['start_time']}"
+        state.booking_suggested_slot = None
+        state.stage = STAGE_BOOKING_NAME
+        state.silence_count = 0
         return _respond_with_gather(state, _booking_name_prompt(suggested["start_time"]), action="/gather-booking")
 
     parsed = nlp.parse_date_phrase(user_input)
     if not parsed:
-        state["retries"] += 1
+        state.retries += 1
         return _respond_with_gather(state, _booking_date_reprompt(), action="/gather-booking")
 
-    state["booking_date"] = parsed
+    state.booking_date = parsed
     slots = _available_slots_for_date(state, parsed)
-    state["booking_available_times"] = slots
-    state["booking_suggested_slot"] = None
-    state["silence_count"] = 0
-    state["retries"] = 0
+    state.booking_available_times = slots
+    state.booking_suggested_slot = None
+    state.silence_count = 0
+    state.retries = 0
     if not slots:
         nxt = _next_available_slot(state)
         if nxt:
-            state["booking_suggested_slot"] = nxt
+            state.booking_suggested_slot = nxt
             message = (
                 f"Sorry, no free times on that day. The next available is {describe_day(nxt['date'])} at {nlp.hhmm_to_12h(nxt['start_time'])}. Would you like that?"
             )
@@ -1399,37 +1652,38 @@ def _handle_booking_date(
             message = "Sorry, I can’t see any available times in the schedule right now."
         return _respond_with_gather(state, message, action="/gather-booking")
 
-    state["stage"] = "booking_time"
+    state.stage = STAGE_BOOKING_TIME
     prompt = _booking_time_prompt(state, parsed, slots)
     return _respond_with_gather(state, prompt, action="/gather-booking")
 
 
 def _handle_booking_time(
-    state: Dict[str, Any], user_input: str, intent: Optional[str], confidence: Optional[float] = None
+    state: CallState, user_input: str, intent: Optional[str], confidence: Optional[float] = None
 ) -> Response:
-    if intent == "goodbye":
+    lowered = user_input.lower().strip()
+    kind = _turn_kind(intent, lowered)
+    if kind == "goodbye":
         return _respond_with_goodbye(state)
-    if intent in BASIC_INFO_INTENTS:
-        state["stage"] = "intent"
+    if kind == "info":
+        state.stage = STAGE_INTENT
         return _handle_primary_intent(state, intent, user_input, confidence=confidence)
-    if intent == "availability":
+    if kind == "availability":
         return _handle_availability_request(state, user_input)
 
-    available_list = list(state.get("booking_available_times") or [])
-    if state.get("booking_date") and not available_list:
-        available_list = _available_slots_for_date(state, state["booking_date"])
-        state["booking_available_times"] = available_list
+    available_list = list(state.booking_available_times or [])
+    if state.booking_date and not available_list:
+        available_list = _available_slots_for_date(state, state.booking_date)
+        state.booking_available_times = available_list
     avail_set = set(available_list)
 
     if not available_list:
-        state["retries"] += 1
+        state.retries += 1
         return _respond_with_gather(
             state,
             "Sorry, I can’t see any free times for that day.",
             action="/gather-booking",
         )
 
-    lowered = user_input.lower().strip()
     if lowered in ANYTIME_PHRASES:
         hhmm = available_list[0]
     else:
@@ -1441,7 +1695,7 @@ def _handle_booking_time(
             hhmm = nlp.fuzzy_pick_time(user_input, available_list)
 
     if not hhmm:
-        state["retries"] += 1
+        state.retries += 1
         return _respond_with_gather(
             state,
             _booking_time_reprompt(state, available_list),
@@ -1449,122 +1703,153 @@ def _handle_booking_time(
         )
 
     if avail_set and hhmm not in avail_set:
-        state["retries"] += 1
+        state.retries += 1
         return _respond_with_gather(
             state,
             _booking_time_reprompt(state, available_list),
             action="/gather-booking",
         )
 
-    state["booking_time"] = hhmm
-    if state.get("booking_date"):
-        state["requested_time"] = f"{state['booking_date']} {hhmm}"
+    state.booking_time = hhmm
+    if state.booking_date:
+        state.requested_time = f"{state.booking_date} {hhmm}"
     else:
-        state["requested_time"] = hhmm
-    state["silence_count"] = 0
-    state["retries"] = 0
+        state.requested_time = hhmm
+    state.silence_count = 0
+    state.retries = 0
     logger.info(
         "Captured booking time",
-        extra={"call_sid": state.get("call_sid"), "time": hhmm, "date": state.get("booking_date")},
+        extra={"call_sid": state.call_sid, "time": hhmm, "date": state.booking_date},
     )
 
-    if state.get("booking_appt_type"):
-        state["stage"] = "booking_name"
+    if state.booking_appt_type:
+        state.stage = STAGE_BOOKING_NAME
         return _respond_with_gather(state, _booking_name_prompt(hhmm), action="/gather-booking")
 
-    state["stage"] = "booking_type"
+    state.stage = STAGE_BOOKING_TYPE
     return _respond_with_gather(state, _booking_type_prompt(), action="/gather-booking")
 
 
 def _handle_booking_name(
-    state: Dict[str, Any], user_input: str, intent: Optional[str], confidence: Optional[float] = None
+    state: CallState, user_input: str, intent: Optional[str], confidence: Optional[float] = None
 ) -> Response:
-    if intent == "goodbye":
+    lowered = user_input.lower().strip()
+    kind = _turn_kind(intent, lowered)
+    if kind == "goodbye":
         return _respond_with_goodbye(state)
-    if intent in BASIC_INFO_INTENTS:
-        state["stage"] = "intent"
+    if kind == "info":
+        state.stage = STAGE_INTENT
         return _handle_primary_intent(state, intent, user_input, confidence=confidence)
-    if intent == "availability":
+    if kind == "availability":
         return _handle_availability_request(state, user_input)
 
     name = _extract_first_name(user_input)
     if not name:
-        state["retries"] += 1
-        attempts = state.get("name_attempts", 0) + 1
-        state["name_attempts"] = attempts
+        state.retries += 1
+        attempts = state.name_attempts + 1
+        state.name_attempts = attempts
         practice = _state_practice(state)
         max_attempts = max(int(practice.max_silence_reprompts or 2), 2)
         if attempts > max_attempts:
             logger.info(
                 "Name capture failed; ending call",
-                extra={"call_sid": state.get("call_sid"), "attempts": attempts},
+                extra={"call_sid": state.call_sid, "attempts": attempts},
             )
-            state.pop("name_attempts", None)
+            state.name_attempts = 0
             return _respond_with_goodbye(state)
         prompt = pick_name_clarifier() or BOOKING_NAME_REPROMPT
         prompt = _with_ack(prompt, 0.7)
         return _respond_with_gather(state, prompt, action="/gather-booking")
 
-    state["caller_name"] = name
-    state["stage"] = "booking_confirm"
-    state["silence_count"] = 0
-    state["retries"] = 0
-    state.pop("name_attempts", None)
+    state.caller_name = name
+    state.stage = STAGE_BOOKING_CONFIRM
+    state.silence_count = 0
+    state.retries = 0
+    state.name_attempts = 0
     logger.info(
         "Captured caller name",
-        extra={"call_sid": state.get("call_sid"), "caller_name": name},
+        extra={"call_sid": state.call_sid, "caller_name": name},
     )
     return _respond_with_gather(state, _booking_confirm_prompt(state), action="/gather-booking")
 
 
 def _handle_booking_confirmation(
-    state: Dict[str, Any], user_input: str, intent: Optional[str], confidence: Optional[float] = None
+    state: CallState, user_input: str, intent: Optional[str], confidence: Optional[float] = None
 ) -> Response:
     lowered = user_input.lower().strip()
-    if intent == "goodbye" or lowered in NEGATIVE_RESPONSES:
-        state["stage"] = "follow_up"
+    kind = _turn_kind(intent, lowered)
+    if kind == "goodbye":
+        state.stage = STAGE_FOLLOW_UP
         return _respond_with_gather(state, BOOKING_DECLINED_PROMPT)
-    if intent in BASIC_INFO_INTENTS:
-        state["stage"] = "intent"
+    if kind == "info":
+        state.stage = STAGE_INTENT
         return _handle_primary_intent(state, intent, user_input, confidence=confidence)
-    if intent == "availability":
+    if kind == "availability":
         return _handle_availability_request(state, user_input)
 
-    if intent == "affirm" or lowered in POSITIVE_RESPONSES:
-        date = state.get("booking_date")
-        time = state.get("booking_time")
-        name = state.get("caller_name") or ""
-        appt_type = state.get("booking_appt_type") or ""
+    if kind == "affirm":
+        date = state.booking_date
+        time = state.booking_time
+        name = state.caller_name or ""
+        appt_type = state.booking_appt_type or ""
         if not (date and time and name and appt_type):
-            state["stage"] = "booking_type"
+            state.stage = STAGE_BOOKING_TYPE
             return _respond_with_gather(state, _booking_type_prompt(), action="/gather-booking")
         profile = _state_profile(state)
         try:
             ok = schedule.reserve_slot(date, time, name, appt_type, profile=profile)
         except TypeError:
             ok = schedule.reserve_slot(date, time, name, appt_type)
+        _invalidate_slots(state, date)
         if ok:
-            state["requested_time"] = f"{date} {time}"
-            state["booking_logged"] = True
-            state["stage"] = "follow_up"
-            state["intent"] = "booking"
+            state.requested_time = f"{date} {time}"
+            state.booking_logged = True
+            state.stage = STAGE_FOLLOW_UP
+            state.intent = "booking"
             return _respond_with_gather(state, _booking_confirmed_message(state))
-        state["stage"] = "booking_date"
-        state["booking_time"] = None
-        state["booking_available_times"] = _available_slots_for_date(state, date) if date else []
+        state.stage = STAGE_BOOKING_DATE
+        state.booking_time = None
+        state.booking_available_times = _available_slots_for_date(state, date) if date else []
         return _respond_with_gather(
             state,
             "Sorry, that slot was just taken. Would you like to pick another time?",
             action="/gather-booking",
         )
 
-    state["retries"] += 1
+    state.retries += 1
     return _respond_with_gather(state, _booking_confirm_prompt(state), action="/gather-booking")
 
 
+BookingHandler = Callable[..., Response]
+
+_BOOKING_SILENCE_REPROMPTS: Dict[str, Callable[[CallState], PromptPayload]] = {
+    STAGE_BOOKING_TYPE: lambda state: _booking_type_reprompt(),
+    STAGE_BOOKING_DATE: lambda state: _booking_date_reprompt(),
+    STAGE_BOOKING_NAME: lambda state: BOOKING_NAME_REPROMPT,
+    STAGE_BOOKING_TIME: lambda state: _booking_time_reprompt(state, state.booking_available_times),
+    STAGE_BOOKING_CONFIRM: lambda state: BOOKING_CONFIRM_REPROMPT,
+}
+
+_BOOKING_HANDLERS: Dict[str, BookingHandler] = {
+    STAGE_BOOKING_TYPE: _handle_booking_type,
+    STAGE_BOOKING_DATE: _handle_booking_date,
+    STAGE_BOOKING_TIME: _handle_booking_time,
+    STAGE_BOOKING_NAME: _handle_booking_name,
+    STAGE_BOOKING_CONFIRM: _handle_booking_confirmation,
+}
+
+
+# Both /health and /status only ever answer {"ok": true}; serialise it once.
+_OK_BODY = JSONResponse({"ok": True}).body
+
+
+def _ok_response(background: Optional[BackgroundTask] = None) -> Response:
+    return Response(content=_OK_BODY, media_type="application/json", background=background)
+
+
 @app.get("/health")
-async def health() -> JSONResponse:
-    return JSONResponse({"ok": True})
+async def health() -> Response:
+    return _ok_response()
 
 
 def _missing_call_sid_response() -> Response:
@@ -1572,7 +1857,7 @@ def _missing_call_sid_response() -> Response:
     return _twiml_response(
         create_goodbye_twiml(
             fallback,
-            voice=_get_active_voice(),
+            voice=_active_voice,
             language=LANGUAGE,
         )
     )
@@ -1604,25 +1889,25 @@ async def voice_webhook(request: Request) -> Response:
         except AttributeError:
             to_number = None
     call_settings = _ensure_state_settings(state, to_number)
-    metadata = state.setdefault("metadata", {})
+    metadata = state.metadata
     if to_number and not metadata.get("to"):
         metadata["to"] = to_number
 
-    if state.get("voice"):
-        _set_active_voice(state["voice"])
+    if state.voice:
+        _set_active_voice(state.voice)
 
-    if state.get("ending") or state.get("stage") == "completed":
+    if state.ending or state.stage == STAGE_COMPLETED:
         return _hangup_only_response()
 
     speech_result = (form.get("SpeechResult") or "").strip()
     if speech_result:
         transcript_add(call_sid, "Caller", speech_result)
 
-    if not state.get("greeted"):
-        state["greeted"] = True
-        state["stage"] = "intent"
-        state["silence_count"] = 0
-        state["retries"] = 0
+    if not state.greeted:
+        state.greeted = True
+        state.stage = STAGE_INTENT
+        state.silence_count = 0
+        state.retries = 0
         logger.info(
             "Incoming call",
             extra={
@@ -1649,13 +1934,13 @@ async def gather_intent_route(request: Request) -> Response:
 
     to_number = (
         (form.get("To") if form else None)
-        or state.get("metadata", {}).get("to")
+        or state.metadata.get("to")
     )
     _ensure_state_settings(state, to_number)
-    if state.get("voice"):
-        _set_active_voice(state["voice"])
+    if state.voice:
+        _set_active_voice(state.voice)
 
-    if state.get("ending") or state.get("stage") == "completed":
+    if state.ending or state.stage == STAGE_COMPLETED:
         return _hangup_only_response()
 
     speech_result = (form.get("SpeechResult") or "").strip()
@@ -1665,24 +1950,24 @@ async def gather_intent_route(request: Request) -> Response:
     except (TypeError, ValueError):
         confidence = None
     if not speech_result:
-        reprompt = CLARIFY_PROMPT if state.get("stage") == "intent" else ANYTHING_ELSE_PROMPT
+        reprompt = CLARIFY_PROMPT if state.stage == STAGE_INTENT else ANYTHING_ELSE_PROMPT
         return _handle_silence(state, reprompt=reprompt)
 
     _remember_caller_line(state, speech_result)
-    state["silence_count"] = 0
+    state.silence_count = 0
 
-    intent, slots = classify_with_slots(speech_result)
+    intent, slots = await _classify_speech(speech_result)
     service_slot = slots.get("service")
     if service_slot:
-        state["last_service"] = service_slot
+        state.last_service = service_slot
     logger.info(
         "Parsed caller input",
-        extra={"call_sid": call_sid, "intent": intent, "stage": state.get("stage")},
+        extra={"call_sid": call_sid, "intent": intent, "stage": state.stage},
     )
 
-    if state.get("stage") == "follow_up":
+    if state.stage == STAGE_FOLLOW_UP:
         return _handle_follow_up(state, intent, speech_result, confidence=confidence)
-    state["stage"] = "intent"
+    state.stage = STAGE_INTENT
     return _handle_primary_intent(state, intent, speech_result, confidence=confidence)
 
 
@@ -1699,13 +1984,13 @@ async def gather_booking_route(request: Request) -> Response:
 
     to_number = (
         (form.get("To") if form else None)
-        or state.get("metadata", {}).get("to")
+        or state.metadata.get("to")
     )
     _ensure_state_settings(state, to_number)
-    if state.get("voice"):
-        _set_active_voice(state["voice"])
+    if state.voice:
+        _set_active_voice(state.voice)
 
-    if state.get("ending") or state.get("stage") == "completed":
+    if state.ending or state.stage == STAGE_COMPLETED:
         return _hangup_only_response()
 
     speech_result = (form.get("SpeechResult") or "").strip()
@@ -1714,56 +1999,84 @@ async def gather_booking_route(request: Request) -> Response:
         confidence = float(raw_confidence) if raw_confidence not in (None, "") else None
     except (TypeError, ValueError):
         confidence = None
-    stage = state.get("stage")
+    stage = state.stage
     if not speech_result:
-        if stage == "booking_type":
-            return _handle_silence(
-                state,
-                reprompt=_booking_type_reprompt(),
-                action="/gather-booking",
-            )
-        if stage == "booking_date":
-            return _handle_silence(
-                state,
-                reprompt=_booking_date_reprompt(),
-                action="/gather-booking",
-            )
-        if stage == "booking_name":
-            return _handle_silence(state, reprompt=BOOKING_NAME_REPROMPT, action="/gather-booking")
-        if stage == "booking_time":
-            return _handle_silence(
-                state,
-                reprompt=_booking_time_reprompt(state, state.get("booking_available_times", [])),
-                action="/gather-booking",
-            )
-        if stage == "booking_confirm":
-            return _handle_silence(state, reprompt=BOOKING_CONFIRM_REPROMPT, action="/gather-booking")
-        return _handle_silence(state, reprompt=CLARIFY_PROMPT)
+        reprompt_for = _BOOKING_SILENCE_REPROMPTS.get(stage)
+        if reprompt_for is None:
+            return _handle_silence(state, reprompt=CLARIFY_PROMPT)
+        return _handle_silence(state, reprompt=reprompt_for(state), action="/gather-booking")
 
     _remember_caller_line(state, speech_result)
-    state["silence_count"] = 0
+    state.silence_count = 0
 
-    intent, slots = classify_with_slots(speech_result)
+    intent, slots = await _classify_speech(speech_result)
     service_slot = slots.get("service")
     if service_slot:
-        state["last_service"] = service_slot
-
-    if stage == "booking_type":
-        return _handle_booking_type(state, speech_result, intent, confidence=confidence)
-    if stage == "booking_date":
-        return _handle_booking_date(state, speech_result, intent, confidence=confidence)
-    if stage == "booking_time":
-        return _handle_booking_time(state, speech_result, intent, confidence=confidence)
-    if stage == "booking_name":
-        return _handle_booking_name(state, speech_result, intent, confidence=confidence)
-    if stage == "booking_confirm":
-        return _handle_booking_confirmation(state, speech_result, intent, confidence=confidence)
+        state.last_service = service_slot
+
+    handler = _BOOKING_HANDLERS.get(stage)
+    if handler is not None:
+        return handler(state, speech_result, intent, confidence=confidence)
 
     return _handle_primary_intent(state, intent, speech_result, confidence=confidence)
 
 
+def _completion_summary(state: CallState, form: Mapping[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """Collect the transcript and build the calls.jsonl record for a finished call."""
+    call_sid = state.call_sid
+    transcript_lines = transcript_pop(call_sid)
+    if transcript_lines:
+        transcript_lines = list(transcript_lines)
+    else:
+        transcript_lines = list(state.transcript or [])
+    state.transcript = transcript_lines
+
+    log_booking = state.intent == "booking" and state.requested_time and not state.booking_logged
+    if log_booking:
+        state.booking_logged = True
+
+    metadata = state.metadata
+    summary = {
+        "call_sid": call_sid,
+        "finished_at": datetime.now(tz=timezone.utc).isoformat(),
+        "direction": form.get("Direction") or metadata.get("direction"),
+        "from": form.get("From") or metadata.get("from"),
+        "to": form.get("To") or metadata.get("to"),
+        "duration_sec": _safe_int(form.get("CallDuration") or metadata.get("duration_sec")),
+        "caller_name": state.caller_name,
+        "intent": state.intent or "other",
+        "requested_time": state.requested_time,
+    }
+    return summary, bool(log_booking)
+
+
+def _finalize_dropped_call(state: CallState, reason: str) -> None:
+    """Persist a call dropped without a /status callback instead of losing it."""
+    try:
+        summary, log_booking = _completion_summary(state, {})
+        summary["dropped"] = reason
+        _finalize_call(state, summary, log_booking)
+    except Exception:
+        logger.exception("Failed to persist dropped call", extra={"call_sid": state.call_sid})
+
+
+def _finalize_call(state: CallState, summary: Dict[str, Any], log_booking: bool) -> None:
+    call_sid = state.call_sid
+    with _finalize_lock:
+        transcript_path = save_transcript(call_sid, state.transcript)
+        state.transcript_file = str(transcript_path)
+        if log_booking:
+            append_booking(call_sid, state.caller_name, state.requested_time)
+        summary["transcript_file"] = str(transcript_path)
+        append_call_record(summary)
+    logger.info(
+        "Call completed",
+        extra={"call_sid": call_sid, "transcript_file": str(transcript_path)},
+    )
+
+
 @app.post("/status")
-async def status_callback(request: Request) -> JSONResponse:
+async def status_callback(request: Request) -> Response:
     form = await request.form()
     call_sid = form.get("CallSid")
     call_status = (form.get("CallStatus") or "").lower()
@@ -1771,46 +2084,24 @@ async def status_callback(request: Request) -> JSONResponse:
     logger.info("Status callback", extra={"call_sid": call_sid, "status": call_status})
 
     if not call_sid:
-        return JSONResponse({"ok": True})
+        return _ok_response()
 
     state = _get_state(call_sid, form, create=False)
 
     if call_status == "completed":
-        state = state or _initial_state(call_sid, dict(form))
-        transcript_lines = transcript_pop(call_sid)
-        if transcript_lines:
-            transcript_lines = list(transcript_lines)
-        else:
-            transcript_lines = list(state.get("transcript") or [])
-        transcript_path = save_transcript(call_sid, transcript_lines)
-        state["transcript"] = transcript_lines
-        state["transcript_file"] = str(transcript_path)
-
-        if state.get("intent") == "booking" and state.get("requested_time") and not state.get("booking_logged"):
-            append_booking(call_sid, state.get("caller_name"), state.get("requested_time"))
-            state["booking_logged"] = True
-
-        metadata = state.get("metadata", {})
-        summary = {
-            "call_sid": call_sid,
-            "finished_at": datetime.now(tz=timezone.utc).isoformat(),
-            "direction": form.get("Direction") or metadata.get("direction"),
-            "from": form.get("From") or metadata.get("from"),
-            "to": form.get("To") or metadata.get("to"),
-            "duration_sec": _safe_int(form.get("CallDuration") or metadata.get("duration_sec")),
-            "caller_name": state.get("caller_name"),
-            "intent": state.get("intent") or "other",
-            "requested_time": state.get("requested_time"),
-            "transcript_file": str(transcript_path),
-        }
-        append_call_record(summary)
-        _pop_state(call_sid)
-        logger.info(
-            "Call completed",
-            extra={"call_sid": call_sid, "transcript_file": str(transcript_path)},
+        state = state or _initial_state(
+            call_sid,
+            from_number=form.get("From"),
+            to_number=form.get("To"),
+            direction=form.get("Direction"),
+            account_sid=form.get("AccountSid"),
         )
+        summary, log_booking = _completion_summary(state, form)
+        _pop_state(call_sid)
+        # The file writes run after the 200 has been sent, in Starlette's threadpool.
+        return _ok_response(background=BackgroundTask(_finalize_call, state, summary, log_booking))
 
-    return JSONResponse({"ok": True})
+    return _ok_response()
 
 
 __all__ = ["app", "create_gather_twiml", "create_goodbye_twiml"]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 from datetime import datetime
 from pathlib import Path
 from typing import Iterable, List, Set
@@ -31,16 +32,32 @@ KEYWORD_SUGGESTIONS = {
 }
 
 
+# One pass over the text finds every keyword. The lookahead keeps matches
+# zero-width so overlapping keywords ("bank holiday" / "holiday") are all seen;
+# no keyword is a prefix of another, so none is shadowed at a shared start.
+_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(re.escape(keyword) for keyword in KEYWORD_SUGGESTIONS) + "))"
+)
+
+
+_SUGGESTION_COUNT = len(set(KEYWORD_SUGGESTIONS.values()))
+
+
 def _scan_transcripts(paths: Iterable[Path]) -> Set[str]:
     hits: Set[str] = set()
     for path in paths:
         try:
-            text = path.read_text(encoding="utf-8").lower()
+            # Transcripts are scanned a line at a time rather than loaded whole;
+            # the scan stops as soon as every suggestion has been triggered.
+            with path.open("r", encoding="utf-8", errors="ignore", buffering=65536) as handle:
+                for line in handle:
+                    hits.update(
+                        KEYWORD_SUGGESTIONS[match.group(1)] for match in _KEYWORD_RE.finditer(line.lower())
+                    )
+                    if len(hits) == _SUGGESTION_COUNT:
+                        return hits
         except OSError:
             continue
-        for keyword, suggestion in KEYWORD_SUGGESTIONS.items():
-            if keyword in text:
-                hits.add(suggestion)
     return hits
 
 
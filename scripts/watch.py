@@ -1,21 +1,56 @@
+import os
 import time
 from pathlib import Path
 
+try:
+    from watchfiles import watch
+except ImportError:  # pragma: no cover - watchfiles ships with uvicorn[standard]
+    watch = None
+
 ROOT = Path(__file__).resolve().parents[1]
 LOG = ROOT / "logs" / "app.log"
+
+
+def _log_changes():
+    """Yield whenever the log may have grown: inotify/FSEvents when available, else polling."""
+    if watch is None:
+        while True:
+            yield
+            time.sleep(0.5)
+    LOG.parent.mkdir(parents=True, exist_ok=True)
+    yield
+    for changes in watch(LOG.parent):
+        if any(Path(path) == LOG for _, path in changes):
+            yield
+
+
+def _emit(handle) -> None:
+    chunk = handle.read()
+    if chunk:
+        print(chunk, end="", flush=True)
+
+
 print(f"Watching: {LOG}")
-last_size = 0
-while True:
-    try:
-        if LOG.exists():
-            size = LOG.stat().st_size
-            if size > last_size:
-                with LOG.open("r", encoding="utf-8", errors="ignore") as f:
-                    f.seek(last_size)
-                    chunk = f.read()
-                    if chunk:
-                        print(chunk, end="")
-                last_size = size
-        time.sleep(0.5)
-    except KeyboardInterrupt:
-        break
+handle = None
+inode = None
+try:
+    for _ in _log_changes():
+        try:
+            stat = LOG.stat()
+        except FileNotFoundError:
+            continue
+        # RotatingFileHandler renames the log away and starts a new file, and
+        # truncation shrinks it in place; either way the open handle is stale.
+        if handle is not None and (stat.st_ino != inode or stat.st_size < handle.tell()):
+            _emit(handle)
+            handle.close()
+            handle = None
+        if handle is None:
+            handle = LOG.open("r", encoding="utf-8", errors="ignore")
+            inode = os.fstat(handle.fileno()).st_ino
+        _emit(handle)
+except KeyboardInterrupt:
+    pass
+finally:
+    if handle is not None:
+        handle.close()
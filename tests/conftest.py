@@ -1,6 +1,41 @@
+import asyncio
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(scope="session")
+def schedule_bytes() -> bytes:
+    """The checked-in schedule, read once and written into each test's tmp dir."""
+    return (ROOT / "data" / "schedule.csv").read_bytes()
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """One event loop shared by every test that drives the async routes."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.run_until_complete(loop.shutdown_default_executor())
+    loop.close()
+
+
+@pytest.fixture
+def stub_schedule(monkeypatch):
+    """Install an in-memory schedule for the booking routes; call it with the open slots."""
+    import main
+
+    def _apply(slots: list[dict[str, str]]) -> None:
+        def list_available(date: str | None = None, limit: int = 6):
+            return [slot for slot in slots if not date or slot["date"] == date][:limit]
+
+        monkeypatch.setattr(main.schedule, "list_available", list_available)
+        monkeypatch.setattr(main.schedule, "find_next_available", lambda: slots[0] if slots else None)
+        monkeypatch.setattr(main.schedule, "reserve_slot", lambda d, t, name, appt: True)
+        main._SLOTS_CACHE.clear()
+
+    return _apply
@@ -11,12 +11,9 @@ def test_parse_date_phrase_weekday(monkeypatch):
     assert nlp.parse_date_phrase("Wednesday") == "2025-09-24"
 
 
-def test_schedule_list_and_reserve(tmp_path, monkeypatch):
-    import shutil
-
-    src = schedule.SCHEDULE_FILE
+def test_schedule_list_and_reserve(tmp_path, monkeypatch, schedule_bytes):
     dst = tmp_path / "schedule.csv"
-    shutil.copy(src, dst)
+    dst.write_bytes(schedule_bytes)
     monkeypatch.setattr(schedule, "SCHEDULE_FILE", dst)
     monkeypatch.setattr(schedule, "BOOKINGS_FILE", tmp_path / "bookings.csv")
 
@@ -90,3 +87,75 @@ def test_list_available_sorted(monkeypatch):
     avail = schedule.list_available(date="2025-09-24")
     times = [slot["start_time"] for slot in avail]
     assert times == ["09:00", "16:00", "16:30"]
+
+
+def test_list_available_orders_by_date_then_time(monkeypatch):
+    from app import schedule
+
+    rows = [
+        ("2025-09-25", "09:00"),
+        ("2025-09-24", "16:00"),
+        ("2025-09-24", "09:30"),
+    ]
+    data = pd.DataFrame(
+        [
+            {
+                "date": day,
+                "weekday": "",
+                "start_time": start,
+                "end_time": "",
+                "status": "Available",
+                "patient_name": "",
+                "appointment_type": "",
+                "notes": "",
+            }
+            for day, start in rows
+        ]
+    )
+    monkeypatch.setattr(schedule, "load_schedule", lambda: data.copy())
+
+    avail = schedule.list_available()
+    assert [(slot["date"], slot["start_time"]) for slot in avail] == sorted(rows)
+
+
+def test_small_schedule_records_match_frame_ordering(monkeypatch):
+    from app import schedule
+
+    rows = [
+        ("2025-09-25", "09:00", "Available", "a"),
+        ("2025-09-24", "16:00", "Available", "b"),
+        ("2025-09-24", "09:30", "Booked", "c"),
+        ("2025-09-24", "09:30", "Available", "d"),
+        ("2025-09-24", "09:30", "Available", "e"),  # tie with "d": input order must hold
+        ("2025-09-24", "9:15", "Available", "f"),
+        ("2025-09-24", "10:00", "available", "g"),  # not an exact "Available"
+        ("2025-09-23", "12:00", "Cancelled", "h"),
+    ]
+    data = pd.DataFrame(
+        [
+            {
+                "date": day,
+                "weekday": "",
+                "start_time": start,
+                "end_time": "",
+                "status": status,
+                "patient_name": "",
+                "appointment_type": "",
+                "notes": note,
+            }
+            for day, start, status, note in rows
+        ]
+    )
+    monkeypatch.setattr(schedule, "load_schedule", lambda: data.copy())
+
+    def listings():
+        return [
+            schedule.list_available(date=day, limit=limit)
+            for day in (None, "2025-09-24", "2025-09-30")
+            for limit in (1, 3, 10)
+        ]
+
+    records = listings()
+    monkeypatch.setattr(schedule, "_SMALL_SCHEDULE_ROWS", 0)
+    assert records == listings()
+    assert [slot["notes"] for slot in records[2]] == ["f", "d", "e", "b", "a"]
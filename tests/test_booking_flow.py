@@ -1,4 +1,3 @@
-import asyncio
 from datetime import date
 from itertools import cycle
 from xml.etree import ElementTree as ET
@@ -28,19 +27,18 @@ def _gather_text(xml: str) -> str:
     return " ".join(texts)
 
 
-def _call_route(route, data: dict[str, str]):
-    response = asyncio.run(route(DummyRequest(data)))
-    return response
+def _call_route(event_loop, route, data: dict[str, str]):
+    return event_loop.run_until_complete(route(DummyRequest(data)))
 
 
 def _first_say_text(xml: str) -> str:
     root = ET.fromstring(xml)
-    say = root.find(".//Say")
+    say = next(root.iter("Say"), None)
     assert say is not None, "Expected Say element"
     return (say.text or "").strip()
 
 
-def test_booking_flow_follows_type_date_time_name(monkeypatch):
+def test_booking_flow_follows_type_date_time_name(event_loop, monkeypatch, stub_schedule):
     CALLS.clear()
     call_sid = "TESTBOOK1"
 
@@ -52,19 +50,13 @@ def test_booking_flow_follows_type_date_time_name(monkeypatch):
         {"date": "2025-09-23", "start_time": "10:30", "end_time": "11:00", "status": "Available"},
     ]
 
-    def fake_list_available(*, date: str | None = None, limit: int = 6):
-        if date:
-            return [slot for slot in slots if slot["date"] == date][:limit]
-        return slots[:limit]
+    stub_schedule(slots)
 
-    monkeypatch.setattr(main.schedule, "list_available", lambda date=None, limit=6: fake_list_available(date=date, limit=limit))
-    monkeypatch.setattr(main.schedule, "find_next_available", lambda: slots[0])
-    monkeypatch.setattr(main.schedule, "reserve_slot", lambda d, t, name, appt: True)
-
-    response = _call_route(voice_webhook, {"CallSid": call_sid})
+    response = _call_route(event_loop, voice_webhook, {"CallSid": call_sid})
     assert response.status_code == 200
 
     response = _call_route(
+        event_loop,
         gather_intent_route,
         {"CallSid": call_sid, "SpeechResult": "I'd like to book an appointment"},
     )
@@ -73,6 +65,7 @@ def test_booking_flow_follows_type_date_time_name(monkeypatch):
     assert "what type" in prompt
 
     response = _call_route(
+        event_loop,
         gather_booking_route,
         {"CallSid": call_sid, "SpeechResult": "check-up"},
     )
@@ -81,6 +74,7 @@ def test_booking_flow_follows_type_date_time_name(monkeypatch):
     assert "what day" in prompt
 
     response = _call_route(
+        event_loop,
         gather_booking_route,
         {"CallSid": call_sid, "SpeechResult": "Tomorrow"},
     )
@@ -90,6 +84,7 @@ def test_booking_flow_follows_type_date_time_name(monkeypatch):
     assert "10:00" in prompt
 
     response = _call_route(
+        event_loop,
         gather_booking_route,
         {"CallSid": call_sid, "SpeechResult": "10am"},
     )
@@ -98,6 +93,7 @@ def test_booking_flow_follows_type_date_time_name(monkeypatch):
     assert "name" in prompt
 
     response = _call_route(
+        event_loop,
         gather_booking_route,
         {"CallSid": call_sid, "SpeechResult": "Jane"},
     )
@@ -107,20 +103,19 @@ def test_booking_flow_follows_type_date_time_name(monkeypatch):
     CALLS.pop(call_sid, None)
 
 
-def test_inline_type_prefill_skips_type_question(monkeypatch):
+def test_inline_type_prefill_skips_type_question(event_loop, monkeypatch, stub_schedule):
     CALLS.clear()
     call_sid = "TESTINLINE"
 
     monkeypatch.setattr(main.nlp, "today_date", lambda: date(2025, 9, 22))
-    monkeypatch.setattr(main.schedule, "list_available", lambda date=None, limit=6: [])
-    monkeypatch.setattr(main.schedule, "find_next_available", lambda: None)
-    monkeypatch.setattr(main.schedule, "reserve_slot", lambda d, t, name, appt: True)
+    stub_schedule([])
 
-    response = _call_route(voice_webhook, {"CallSid": call_sid})
+    response = _call_route(event_loop, voice_webhook, {"CallSid": call_sid})
     assert response.status_code == 200
 
     phrase = "I want to book a hygiene appointment on Wednesday"
     response = _call_route(
+        event_loop,
         gather_intent_route,
         {"CallSid": call_sid, "SpeechResult": phrase},
     )
@@ -131,12 +126,12 @@ def test_inline_type_prefill_skips_type_question(monkeypatch):
 
     state = CALLS.get(call_sid)
     assert state is not None
-    assert state.get("booking_appt_type") == "Hygiene"
-    assert state.get("stage") == "booking_date"
+    assert state.booking_appt_type == "Hygiene"
+    assert state.stage == "booking_date"
     CALLS.pop(call_sid, None)
 
 
-def test_booking_confirmation_prompts_anything_else_and_goodbye(monkeypatch):
+def test_booking_confirmation_prompts_anything_else_and_goodbye(event_loop, monkeypatch, stub_schedule):
     CALLS.clear()
     call_sid = "TESTCLOSE"
 
@@ -148,25 +143,21 @@ def test_booking_confirmation_prompts_anything_else_and_goodbye(monkeypatch):
         {"date": "2025-09-24", "start_time": "16:30", "end_time": "17:00", "status": "Available"},
     ]
 
-    def fake_list_available(*, date: str | None = None, limit: int = 6):
-        pool = [slot for slot in slots if not date or slot["date"] == date]
-        return pool[:limit]
-
-    monkeypatch.setattr(main.schedule, "list_available", lambda date=None, limit=6: fake_list_available(date=date, limit=limit))
-    monkeypatch.setattr(main.schedule, "find_next_available", lambda: slots[0])
-    monkeypatch.setattr(main.schedule, "reserve_slot", lambda d, t, name, appt: True)
+    stub_schedule(slots)
     monkeypatch.setattr(main, "_goodbye_cycle", cycle(["Thanks for calling, goodbye."]))
 
-    response = _call_route(voice_webhook, {"CallSid": call_sid})
+    response = _call_route(event_loop, voice_webhook, {"CallSid": call_sid})
     assert response.status_code == 200
 
     response = _call_route(
+        event_loop,
         gather_intent_route,
         {"CallSid": call_sid, "SpeechResult": "I'd like to book an appointment"},
     )
     assert response.status_code == 200
 
     response = _call_route(
+        event_loop,
         gather_booking_route,
         {"CallSid": call_sid, "SpeechResult": "Hygiene"},
     )
@@ -174,6 +165,7 @@ def test_booking_confirmation_prompts_anything_else_and_goodbye(monkeypatch):
     assert "what day" in prompt.lower()
 
     response = _call_route(
+        event_loop,
         gather_booking_route,
         {"CallSid": call_sid, "SpeechResult": "Wednesday"},
     )
@@ -183,6 +175,7 @@ def test_booking_confirmation_prompts_anything_else_and_goodbye(monkeypatch):
     assert "16:30" in prompt
 
     response = _call_route(
+        event_loop,
         gather_booking_route,
         {"CallSid": call_sid, "SpeechResult": "4:00 p.m."},
     )
@@ -190,6 +183,7 @@ def test_booking_confirmation_prompts_anything_else_and_goodbye(monkeypatch):
     assert "name" in prompt.lower()
 
     response = _call_route(
+        event_loop,
         gather_booking_route,
         {"CallSid": call_sid, "SpeechResult": "Alice"},
     )
@@ -197,6 +191,7 @@ def test_booking_confirmation_prompts_anything_else_and_goodbye(monkeypatch):
     assert "shall i book you in" in prompt.lower()
 
     response = _call_route(
+        event_loop,
         gather_booking_route,
         {"CallSid": call_sid, "SpeechResult": "yes please"},
     )
@@ -205,6 +200,7 @@ def test_booking_confirmation_prompts_anything_else_and_goodbye(monkeypatch):
     assert "By providing your number, you agree to receive appointment confirmations and reminders." in prompt
 
     response = _call_route(
+        event_loop,
         gather_intent_route,
         {"CallSid": call_sid, "SpeechResult": "No thanks"},
     )
@@ -214,7 +210,44 @@ def test_booking_confirmation_prompts_anything_else_and_goodbye(monkeypatch):
 
     state = CALLS.get(call_sid)
     assert state is not None
-    transcript_lines = state.get("transcript") or []
+    transcript_lines = state.transcript
     assert any("Is there anything else I can help you with?" in line for line in transcript_lines)
     assert any("Thanks for calling, goodbye." in line for line in transcript_lines)
     CALLS.pop(call_sid, None)
+
+
+def test_available_slots_are_cached_until_booking(monkeypatch):
+    main._SLOTS_CACHE.clear()
+    calls = []
+
+    def fake_list_available(date=None, limit=6):
+        calls.append(date)
+        return [{"date": date, "start_time": "09:00"}]
+
+    monkeypatch.setattr(main.schedule, "list_available", fake_list_available)
+    state = main.CallState(call_sid="TESTCACHE")
+
+    assert main._available_slots_for_date(state, "2025-09-24") == ["09:00"]
+    assert main._available_slots_for_date(state, "2025-09-24") == ["09:00"]
+    assert calls == ["2025-09-24"]
+
+    main._invalidate_slots(state, "2025-09-24")
+    main._available_slots_for_date(state, "2025-09-24")
+    assert calls == ["2025-09-24", "2025-09-24"]
+    main._SLOTS_CACHE.clear()
+
+
+def test_short_yes_no_replies_skip_the_classifier(event_loop, monkeypatch):
+    def fail(_text):
+        raise AssertionError("classifier should not run for yes/no replies")
+
+    monkeypatch.setattr(main, "classify_with_slots", fail)
+    assert event_loop.run_until_complete(main._classify_speech("Okay")) == ("affirm", {})
+    assert event_loop.run_until_complete(main._classify_speech(" nope ")) == ("goodbye", {})
+
+
+def test_extract_first_name_strips_lead_in_phrases():
+    assert main._extract_first_name("my name is sarah jones") == "Sarah"
+    assert main._extract_first_name("It's Tom.") == "Tom"
+    assert main._extract_first_name("my name is") is None
+    assert main._extract_first_name("   ") is None
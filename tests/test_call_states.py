@@ -0,0 +1,73 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import main
+from app import persistence
+from main import CALLS
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    monkeypatch.setattr(persistence, "TRANSCRIPTS_DIR", tmp_path / "transcripts")
+    monkeypatch.setattr(persistence, "DATA_DIR", data_dir)
+    monkeypatch.setattr(persistence, "BOOKINGS_CSV", data_dir / "bookings.csv")
+    monkeypatch.setattr(persistence, "CALLS_JSONL", data_dir / "calls.jsonl")
+    return data_dir
+
+
+def _call_records(data_dir):
+    return [json.loads(line) for line in (data_dir / "calls.jsonl").read_text(encoding="utf-8").splitlines()]
+
+
+def test_reaper_finalises_calls_idle_past_ttl(data_dir):
+    CALLS.clear()
+    now = datetime(2025, 9, 22, 12, 0, tzinfo=timezone.utc)
+    stale = main._get_state("TESTSTALE", {})
+    fresh = main._get_state("TESTFRESH", {})
+    persistence.transcript_add("TESTSTALE", "Caller", "Hello?")
+    stale.last_activity = now - main.CALL_STATE_TTL - timedelta(seconds=1)
+    # A long call that is still talking must survive.
+    fresh.started_at = now - main.CALL_STATE_TTL * 2
+    fresh.last_activity = now - timedelta(minutes=1)
+
+    assert main._reap_call_states(now) == 1
+    assert "TESTSTALE" not in CALLS
+    assert "TESTFRESH" in CALLS
+    [record] = _call_records(data_dir)
+    assert record["call_sid"] == "TESTSTALE"
+    assert record["dropped"] == "expired"
+    with open(record["transcript_file"], encoding="utf-8") as handle:
+        assert "[Caller] Hello?" in handle.read()
+    CALLS.clear()
+
+
+def test_oldest_call_is_evicted_at_capacity(monkeypatch, data_dir):
+    CALLS.clear()
+    monkeypatch.setattr(main, "MAX_CALLS", 2)
+    for call_sid in ("TESTCAP1", "TESTCAP2", "TESTCAP3"):
+        main._get_state(call_sid, {})
+
+    assert sorted(CALLS) == ["TESTCAP2", "TESTCAP3"]
+    for thread in threading.enumerate():
+        if thread.name == "call-state-evict":
+            thread.join()
+    [record] = _call_records(data_dir)
+    assert record["call_sid"] == "TESTCAP1"
+    assert record["dropped"] == "evicted"
+    CALLS.clear()
+
+
+def test_call_states_are_spread_across_shards():
+    CALLS.clear()
+    for index in range(64):
+        main._get_state(f"TESTSHARD{index}", {})
+
+    assert len(CALLS) == 64
+    assert sum(1 for shard, _lock in CALLS.shards() if shard) > 1
+    assert CALLS.pop("TESTSHARD0").call_sid == "TESTSHARD0"
+    assert "TESTSHARD0" not in CALLS
+    CALLS.clear()
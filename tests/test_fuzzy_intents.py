@@ -14,3 +14,13 @@ def test_fuzzy_booking():
 def test_goodbye_variants():
     assert classify("that's it") == "goodbye"
     assert classify("no more") == "goodbye"
+
+
+def test_fuzzy_vocab_respects_edit_distance():
+    from app.intent import _FuzzyVocab
+
+    vocab = _FuzzyVocab({"wednesday", "opening hours"}, max_dist=2)
+    assert vocab.matches("is wensday ok")
+    assert vocab.matches("what are your opening hours")
+    assert not vocab.matches("what about wnsdy")
+    assert not vocab.matches("opening")
@@ -10,3 +10,17 @@ def test_human_day_phrase_basic(monkeypatch):
     assert nlp.human_day_phrase("2025-09-23").lower() == "tomorrow"
     assert nlp.human_day_phrase("2025-09-25").lower() == "this thursday"
     assert "thursday the" in nlp.human_day_phrase("2025-10-02").lower()
+
+
+def test_parse_date_phrase_cache_follows_today(monkeypatch):
+    monkeypatch.setattr(nlp, "today_date", lambda: date(2025, 9, 22))
+    assert nlp.parse_date_phrase("Tomorrow ") == "2025-09-23"
+    monkeypatch.setattr(nlp, "today_date", lambda: date(2025, 9, 23))
+    assert nlp.parse_date_phrase("tomorrow") == "2025-09-24"
+
+
+def test_human_day_phrase_cache_follows_today(monkeypatch):
+    monkeypatch.setattr(nlp, "today_date", lambda: date(2025, 9, 22))
+    assert nlp.human_day_phrase("2025-09-23") == "tomorrow"
+    monkeypatch.setattr(nlp, "today_date", lambda: date(2025, 9, 23))
+    assert nlp.human_day_phrase("2025-09-23") == "today"
@@ -1,11 +1,9 @@
 from app import schedule
 
 
-def test_schedule_cycle(tmp_path, monkeypatch):
-    import shutil
-
+def test_schedule_cycle(tmp_path, monkeypatch, schedule_bytes):
     data_file = tmp_path / "schedule.csv"
-    shutil.copy("data/schedule.csv", data_file)
+    data_file.write_bytes(schedule_bytes)
     monkeypatch.setattr(schedule, "SCHEDULE_FILE", data_file)
     monkeypatch.setattr(schedule, "BOOKINGS_FILE", tmp_path / "bookings.csv")
 
@@ -19,3 +17,24 @@ def test_schedule_cycle(tmp_path, monkeypatch):
     assert ok
     df2 = schedule.load_schedule()
     assert (df2[df2["date"] == s0["date"]]["status"] == "Booked").any()
+
+
+def test_load_schedule_reuses_parse_until_file_changes(tmp_path, monkeypatch, schedule_bytes):
+    data_file = tmp_path / "schedule.csv"
+    data_file.write_bytes(schedule_bytes)
+    monkeypatch.setattr(schedule, "SCHEDULE_FILE", data_file)
+
+    calls = []
+    real_read_csv = schedule.pd.read_csv
+    monkeypatch.setattr(schedule.pd, "read_csv", lambda *a, **k: calls.append(a) or real_read_csv(*a, **k))
+
+    first = schedule.load_schedule()
+    first.loc[first.index[0], "notes"] = "edited"
+    second = schedule.load_schedule()
+    assert len(calls) == 1
+    assert second.iloc[0]["notes"] != "edited"
+
+    schedule.save_schedule(first)
+    third = schedule.load_schedule()
+    assert len(calls) == 2
+    assert third.iloc[0]["notes"] == "edited"
@@ -0,0 +1,125 @@
+import asyncio
+
+from app.security import TwilioRequestValidationMiddleware
+
+
+class _Validator:
+    def __init__(self, valid: bool = True) -> None:
+        self.valid = valid
+        self.calls = []
+
+    def validate(self, url, params, signature):
+        self.calls.append((url, params, signature))
+        return self.valid
+
+
+async def _echo_app(scope, receive, send):
+    message = await receive()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": message.get("body", b"")})
+
+
+def _run(middleware, path, body=b"", headers=None):
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "scheme": "https",
+        "server": ("bot.example.com", 443),
+        "path": path,
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    status = sent[0]["status"]
+    payload = b"".join(m.get("body", b"") for m in sent[1:])
+    return status, payload
+
+
+def test_unprotected_paths_skip_validation():
+    validator = _Validator(valid=False)
+    middleware = TwilioRequestValidationMiddleware(
+        _echo_app, validator=validator, enabled=True, protected_paths=["/voice"]
+    )
+    status, payload = _run(middleware, "/health", b"ping")
+    assert status == 200
+    assert payload == b"ping"
+    assert validator.calls == []
+
+
+def test_missing_signature_is_rejected():
+    middleware = TwilioRequestValidationMiddleware(
+        _echo_app, validator=_Validator(), enabled=True, protected_paths=["/voice"]
+    )
+    status, _ = _run(middleware, "/voice", b"CallSid=CA1")
+    assert status == 403
+
+
+def test_valid_signature_replays_body_to_app():
+    validator = _Validator()
+    middleware = TwilioRequestValidationMiddleware(
+        _echo_app, validator=validator, enabled=True, protected_paths=["/voice"]
+    )
+    body = b"CallSid=CA1&From=%2B447700900000"
+    status, payload = _run(
+        middleware,
+        "/voice",
+        body,
+        {"X-Twilio-Signature": "sig", "Content-Type": "application/x-www-form-urlencoded"},
+    )
+    assert status == 200
+    assert payload == body
+    url, params, signature = validator.calls[0]
+    assert url == "https://bot.example.com/voice"
+    assert params == {"CallSid": "CA1", "From": "+447700900000"}
+    assert signature == "sig"
+
+
+def test_invalid_signature_is_rejected():
+    middleware = TwilioRequestValidationMiddleware(
+        _echo_app, validator=_Validator(valid=False), enabled=True, protected_paths=["/voice"]
+    )
+    status, payload = _run(middleware, "/voice", b"CallSid=CA1", {"X-Twilio-Signature": "bad"})
+    assert status == 403
+    assert payload == b"Invalid Twilio signature"
+
+
+def test_repeated_deliveries_reuse_the_validation_result():
+    validator = _Validator()
+    middleware = TwilioRequestValidationMiddleware(
+        _echo_app, validator=validator, enabled=True, protected_paths=["/status"]
+    )
+    headers = {"X-Twilio-Signature": "sig", "Content-Type": "application/x-www-form-urlencoded"}
+    for _ in range(3):
+        status, _ = _run(middleware, "/status", b"CallSid=CA1&CallStatus=completed", headers)
+        assert status == 200
+    assert len(validator.calls) == 1
+
+    _run(middleware, "/status", b"CallSid=CA2&CallStatus=completed", headers)
+    assert len(validator.calls) == 2
+
+
+def test_oversized_bodies_are_refused_before_validation():
+    validator = _Validator()
+    middleware = TwilioRequestValidationMiddleware(
+        _echo_app, validator=validator, enabled=True, protected_paths=["/voice"]
+    )
+    body = b"x" * (17 * 1024)
+    status, _ = _run(
+        middleware,
+        "/voice",
+        body,
+        {"X-Twilio-Signature": "sig", "Content-Length": str(len(body))},
+    )
+    assert status == 413
+    status, _ = _run(middleware, "/voice", body, {"X-Twilio-Signature": "sig"})
+    assert status == 413
+    assert validator.calls == []
@@ -27,3 +27,75 @@ def test_transcript_add_and_save(tmp_path, monkeypatch):
     assert "[Agent] Hello there" in content
     assert "[Caller] I need an appointment" in content
     assert content.strip() != ""
+
+
+def test_status_callback_writes_files_after_responding(tmp_path, monkeypatch):
+    import asyncio
+    import json
+    from pathlib import Path
+
+    import main
+    from app import persistence
+
+    data_dir = tmp_path / "data"
+    monkeypatch.setattr(persistence, "TRANSCRIPTS_DIR", tmp_path / "transcripts")
+    monkeypatch.setattr(persistence, "DATA_DIR", data_dir)
+    monkeypatch.setattr(persistence, "BOOKINGS_CSV", data_dir / "bookings.csv")
+    monkeypatch.setattr(persistence, "CALLS_JSONL", data_dir / "calls.jsonl")
+
+    class _Request:
+        async def form(self):
+            return {"CallSid": "TESTSTATUS", "CallStatus": "completed", "CallDuration": "42"}
+
+    main._get_state("TESTSTATUS", {"From": "+447700900000"})
+    persistence.transcript_add("TESTSTATUS", "Caller", "Bye")
+
+    response = asyncio.run(main.status_callback(_Request()))
+    assert response.status_code == 200
+    assert "TESTSTATUS" not in main.CALLS
+    assert not (data_dir / "calls.jsonl").exists()
+
+    asyncio.run(response.background())
+    record = json.loads((data_dir / "calls.jsonl").read_text(encoding="utf-8"))
+    assert record["call_sid"] == "TESTSTATUS"
+    assert record["duration_sec"] == 42
+    assert "[Caller] Bye" in Path(record["transcript_file"]).read_text(encoding="utf-8")
+
+
+def test_concurrent_call_finalisation_keeps_every_transcript(tmp_path, monkeypatch):
+    import json
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+
+    import main
+    from app import persistence
+
+    data_dir = tmp_path / "data"
+    monkeypatch.setattr(persistence, "TRANSCRIPTS_DIR", tmp_path / "transcripts")
+    monkeypatch.setattr(persistence, "DATA_DIR", data_dir)
+    monkeypatch.setattr(persistence, "BOOKINGS_CSV", data_dir / "bookings.csv")
+    monkeypatch.setattr(persistence, "CALLS_JSONL", data_dir / "calls.jsonl")
+
+    calls = 64
+    states = []
+    for i in range(calls):
+        state = main._initial_state(f"TESTFIN{i}", from_number=None, to_number=None, direction=None, account_sid=None)
+        state.transcript = [f"[Caller] line {i}"]
+        state.caller_name = f"Caller {i}"
+        state.requested_time = "2025-09-23 10:00"
+        states.append(state)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(lambda state: main._finalize_call(state, {"call_sid": state.call_sid}, True), states))
+    finally:
+        sys.setswitchinterval(interval)
+
+    records = [json.loads(line) for line in (data_dir / "calls.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert len({record["transcript_file"] for record in records}) == calls
+    assert len(list((tmp_path / "transcripts").glob("*.txt"))) == calls
+    bookings = (data_dir / "bookings.csv").read_text(encoding="utf-8").splitlines()
+    assert bookings[0].startswith("timestamp,")
+    assert len(bookings) == calls + 1
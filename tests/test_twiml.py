@@ -76,3 +76,55 @@ def test_gather_splits_long_prompt_into_multiple_chunks():
     combined = " ".join((say.text or "").strip() for say in says)
     assert "appointments available next Tuesday" in combined
     assert "Wednesday at nine" in combined
+
+
+def test_gather_twiml_is_reused_for_repeated_prompts():
+    from main import _build_gather_twiml
+
+    segments = [("say", "Is there anything else I can help you with?"), ("pause", "0.3")]
+    first = create_gather_twiml(segments, action="/gather-intent", voice=VOICE, language=LANGUAGE)
+    hits = _build_gather_twiml.cache_info().hits
+    second = create_gather_twiml(list(segments), action="/gather-intent", voice=VOICE, language=LANGUAGE)
+    assert second == first
+    assert _build_gather_twiml.cache_info().hits == hits + 1
+
+
+def test_goodbye_twiml_is_reused_for_repeated_messages():
+    from main import _build_goodbye_twiml
+
+    first = create_goodbye_twiml([["say", "Thanks for calling. Goodbye."]], voice=VOICE, language=LANGUAGE)
+    hits = _build_goodbye_twiml.cache_info().hits
+    second = create_goodbye_twiml([("say", "Thanks for calling. Goodbye.")], voice=VOICE, language=LANGUAGE)
+    assert second == first
+    assert _build_goodbye_twiml.cache_info().hits == hits + 1
+
+
+def test_ssml_segments_render_as_say_children():
+    ssml = '<speak><prosody rate="medium">Fish &amp; chips <break time="150ms"/>at noon</prosody></speak>'
+    xml = create_gather_twiml(
+        [("ssml", ("Fish & chips at noon", ssml))],
+        action="/gather-booking",
+        voice=VOICE,
+        language=LANGUAGE,
+    )
+    say = _parse_gather(xml).find("Say")
+    assert say.text == "Fish & chips at noon"
+    prosody = say.find("prosody")
+    assert prosody is not None and prosody.attrib == {"rate": "medium"}
+    assert prosody.text == "Fish & chips"
+    assert prosody.find("break").attrib == {"time": "150ms"}
+    assert "&amp;" in xml
+
+
+def test_ssml_unknown_wrapper_keeps_text_after_children():
+    ssml = '<speak><p>Your slot is <break time="200ms"/>ten o\'clock</p></speak>'
+    xml = create_gather_twiml(
+        [("ssml", ("Your slot is ten o'clock", ssml))],
+        action="/gather-booking",
+        voice=VOICE,
+        language=LANGUAGE,
+    )
+    say = _parse_gather(xml).find("Say")
+    pause = say.find("break")
+    assert pause is not None and pause.attrib == {"time": "200ms"}
+    assert pause.tail == "ten o'clock"